@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for Early Bird sensor and API performance
+
+Generates deterministic multi-year child histories, times every public
+EarlyBirdSensor method and every run.py route at several data sizes, and
+saves or compares the results as a JSON baseline.
+
+Usage:
+    python benchmark_sensor.py --save benchmark_baseline.json
+    python benchmark_sensor.py --compare benchmark_baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the early_bird directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'early_bird'))
+
+from sensor import EarlyBirdSensor
+
+# Weeks between birth and due date of the synthetic child
+PREMATURE_WEEKS = 8
+
+# Public sensor methods that are not benchmarked
+NOT_BENCHMARKED = {"close", "add_change_listener"}
+
+# Routes that are not benchmarked (endless stream, static files)
+NOT_BENCHMARKED_ROUTES = {"/api/stream", "/api/debug/profiles/<name>", "/static/<path:filename>"}
+
+
+def generate_history(years, seed=42, end=None):
+    """
+    Generate a realistic child history as import rows
+
+    The same years and seed always produce the same records relative to the
+    birth date; the history ends at midnight of `end`.
+
+    Args:
+        years: Length of the history in years
+        seed: Random seed
+        end: Last day of the history (defaults to today)
+
+    Returns:
+        tuple: (birth_date, due_date, rows) with rows in the NDJSON import format
+    """
+    rng = random.Random(seed)
+    end = (end or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    days = int(years * 365)
+    birth = end - timedelta(days=days)
+    due = birth + timedelta(weeks=PREMATURE_WEEKS)
+    rows = []
+
+    # Sleep: one night and up to three naps per day, fewer naps with age
+    for day in range(days):
+        date = birth + timedelta(days=day)
+        naps = 3 if day < 270 else 2 if day < 540 else 1 if day < 1100 else rng.randint(0, 1)
+        for nap in range(naps):
+            start = date + timedelta(hours=9 + nap * 3, minutes=rng.randint(0, 45))
+            rows.append({
+                "section": "sleep_records",
+                "sleep_type": "nap",
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(minutes=rng.randint(25, 120))).isoformat(),
+                "quality": rng.choice(("good", "normal", "normal", "poor"))
+            })
+        start = date + timedelta(hours=19, minutes=rng.randint(0, 90))
+        rows.append({
+            "section": "sleep_records",
+            "sleep_type": "night",
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=9, minutes=rng.randint(30, 150))).isoformat(),
+            "quality": rng.choice(("good", "good", "normal", "poor")),
+            "notes": rng.choice(("", "", "Woke up twice", "Teething"))
+        })
+
+    # Growth: weekly measurements along a smooth curve with noise
+    for week in range(days // 7):
+        factor = 1 - 0.985 ** week
+        rows.append({
+            "section": "growth_records",
+            "date": (birth + timedelta(weeks=week)).isoformat(),
+            "weight_kg": round(1.8 + 15 * factor + rng.uniform(-0.1, 0.1), 2),
+            "height_cm": round(42 + 62 * factor + rng.uniform(-0.5, 0.5), 1),
+            "head_circumference_cm": round(30 + 20 * factor + rng.uniform(-0.3, 0.3), 1)
+        })
+
+    # Milestones: the known milestones at their corrected age plus about
+    # one recorded moment per week
+    for category, milestones in EarlyBirdSensor.MILESTONES.items():
+        for milestone in milestones:
+            date = due + timedelta(weeks=milestone["age_weeks"] + rng.randint(-2, 4))
+            if birth <= date < end:
+                rows.append({
+                    "section": "milestone_achievements",
+                    "date": date.isoformat(),
+                    "category": category,
+                    "milestone": milestone["milestone"]
+                })
+    categories = list(EarlyBirdSensor.MILESTONES)
+    for number in range(days // 7):
+        rows.append({
+            "section": "milestone_achievements",
+            "date": (birth + timedelta(days=rng.randrange(days))).isoformat(),
+            "category": rng.choice(categories),
+            "milestone": f"Moment {number + 1}",
+            "notes": rng.choice(("", "Grandma was visiting", "First time outside"))
+        })
+
+    # U-examinations: every examination that is due within the history
+    for exam in EarlyBirdSensor.U_EXAMINATIONS:
+        date = max(birth, due + timedelta(weeks=exam["age_weeks_min"]))
+        if date < end:
+            rows.append({"section": "u_examinations_records", "exam_name": exam["name"], "date": date.isoformat()})
+
+    return birth.strftime("%Y-%m-%d"), due.strftime("%Y-%m-%d"), rows
+
+
+def load_history(directory, years, seed, engine):
+    """
+    Create a sensor with a generated history
+
+    Returns:
+        tuple: (sensor, import duration in ms, generated rows)
+    """
+    birth_date, due_date, rows = generate_history(years, seed)
+    sensor = EarlyBirdSensor(
+        child_name="Bench Baby",
+        birth_date=birth_date,
+        due_date=due_date,
+        data_file=os.path.join(directory, f"bench_{years}y.json"),
+        storage_engine=engine
+    )
+    start = time.perf_counter()
+    result = sensor.import_records([json.dumps(row) for row in rows])
+    duration = (time.perf_counter() - start) * 1000
+    if result["errors"]:
+        raise ValueError(f"Generated history not imported: {result['errors'][:3]}")
+    return sensor, duration, rows
+
+
+def sensor_benchmarks(sensor):
+    """
+    Get the sensor calls to time
+
+    Returns:
+        list: (name, callable) tuples; the name starts with the method name
+    """
+    # Records are added for yesterday, which is never in the future
+    end = datetime.now().date() - timedelta(days=1)
+    start = (end - timedelta(days=365)).isoformat()
+    month = datetime.now().strftime("%Y-%m")
+    import_lines = [json.dumps({
+        "section": "growth_records", "date": f"{end.isoformat()}T08:00:00",
+        "weight_kg": 16.8, "height_cm": 104.0
+    })]
+
+    return [
+        ("calculate_corrected_age", lambda: sensor.calculate_corrected_age()),
+        ("create_context", lambda: sensor.create_context()),
+        ("get_corrected_day", lambda: sensor.get_corrected_day()),
+        ("get_current_wonder_week", lambda: sensor.get_current_wonder_week()),
+        ("get_upcoming_milestones", lambda: sensor.get_upcoming_milestones()),
+        ("get_summary", lambda: sensor.get_summary()),
+        ("get_dashboard", lambda: sensor.get_dashboard()),
+        ("get_daily_encouragement", lambda: sensor.get_daily_encouragement()),
+        ("get_u_examinations_status", lambda: sensor.get_u_examinations_status()),
+        ("get_growth_history", lambda: sensor.get_growth_history()),
+        ("get_growth_history_page", lambda: sensor.get_growth_history_page()),
+        ("get_milestone_history", lambda: sensor.get_milestone_history()),
+        ("get_milestone_history_page", lambda: sensor.get_milestone_history_page()),
+        ("get_growth_chart_data", lambda: sensor.get_growth_chart_data()),
+        ("get_growth_statistics", lambda: sensor.get_growth_statistics()),
+        ("get_sleep_summary", lambda: sensor.get_sleep_summary()),
+        ("get_sleep_summary[365d]", lambda: sensor.get_sleep_summary(days_back=365)),
+        ("get_sleep_series[week]", lambda: sensor.get_sleep_series(start, end.isoformat(), "week")),
+        ("get_sleep_records", lambda: sensor.get_sleep_records()),
+        ("get_progress_reminder", lambda: sensor.get_progress_reminder()),
+        ("get_pride_archive", lambda: sensor.get_pride_archive()),
+        ("get_pride_archive[page]", lambda: sensor.get_pride_archive(limit=50)),
+        ("get_monthly_summary", lambda: sensor.get_monthly_summary(month)),
+        ("get_changes", lambda: sensor.get_changes(since=0, limit=500)),
+        ("get_cache_stats", lambda: sensor.get_cache_stats()),
+        ("export_records", lambda: "".join(sensor.export_records())),
+        ("refresh", lambda: sensor.refresh()),
+        # Writers last, each adds one record
+        ("add_growth_record", lambda: sensor.add_growth_record(16.8, 104.0)),
+        ("add_milestone_achievement", lambda: sensor.add_milestone_achievement("life_moments", "Benchmark")),
+        ("add_sleep_record", lambda: sensor.add_sleep_record(
+            "nap", f"{end.isoformat()}T13:00:00", f"{end.isoformat()}T14:00:00")),
+        ("mark_u_examination_completed", lambda: sensor.mark_u_examination_completed("U1")),
+        ("import_records", lambda: sensor.import_records(import_lines))
+    ]
+
+
+def route_benchmarks(client):
+    """
+    Get the API requests to time
+
+    Returns:
+        list: (name, route rule, callable) tuples
+    """
+    yesterday = (datetime.now().date() - timedelta(days=1)).isoformat()
+    month = datetime.now().strftime("%Y-%m")
+    sleep = {"sleep_type": "nap", "start_time": f"{yesterday}T13:00:00", "end_time": f"{yesterday}T14:00:00"}
+    growth_row = json.dumps({"section": "growth_records", "date": yesterday, "weight_kg": 16.8, "height_cm": 104.0})
+
+    gets = [
+        ("/", "/"),
+        ("/information", "/information"),
+        ("/calming-techniques", "/calming-techniques"),
+        ("/bonding-tips", "/bonding-tips"),
+        ("/archive", "/archive"),
+        ("/health", "/health"),
+        ("/metrics", "/metrics"),
+        ("/api/summary", "/api/summary"),
+        ("/api/dashboard", "/api/dashboard"),
+        ("/api/encouragement", "/api/encouragement"),
+        ("/api/age", "/api/age"),
+        ("/api/wonder-weeks", "/api/wonder-weeks"),
+        ("/api/milestones", "/api/milestones"),
+        ("/api/growth", "/api/growth"),
+        ("/api/growth", "/api/growth?limit=50"),
+        ("/api/milestone-achievements", "/api/milestone-achievements"),
+        ("/api/milestone-achievements", "/api/milestone-achievements?limit=50"),
+        ("/api/u-examinations", "/api/u-examinations"),
+        ("/api/sleep/summary", "/api/sleep/summary"),
+        ("/api/sleep/summary", "/api/sleep/summary?days_back=365"),
+        ("/api/sleep/series", "/api/sleep/series?bucket=week&from=" + (datetime.now().date() - timedelta(days=365)).isoformat()),
+        ("/api/sleep/records", "/api/sleep/records"),
+        ("/api/progress-reminder", "/api/progress-reminder"),
+        ("/api/growth/chart/<measurement_type>", "/api/growth/chart/weight"),
+        ("/api/growth/statistics", "/api/growth/statistics"),
+        ("/api/pride-archive", "/api/pride-archive"),
+        ("/api/pride-archive", "/api/pride-archive?limit=50"),
+        ("/api/pride-archive/monthly/<year_month>", f"/api/pride-archive/monthly/{month}"),
+        ("/api/changes", "/api/changes?since=0&limit=500"),
+        ("/api/export", "/api/export"),
+        ("/api/cache/stats", "/api/cache/stats"),
+        ("/api/debug/profiles", "/api/debug/profiles")
+    ]
+    benchmarks = [
+        (f"GET {url}", rule, lambda url=url: client.get(url))
+        for rule, url in gets
+    ]
+    benchmarks += [
+        ("POST /api/growth", "/api/growth",
+         lambda: client.post("/api/growth", json={"weight_kg": 16.8, "height_cm": 104.0})),
+        ("POST /api/milestone-achievements", "/api/milestone-achievements",
+         lambda: client.post("/api/milestone-achievements", json={"category": "life_moments", "milestone": "Benchmark"})),
+        ("POST /api/sleep", "/api/sleep", lambda: client.post("/api/sleep", json=sleep)),
+        ("POST /api/u-examinations/complete", "/api/u-examinations/complete",
+         lambda: client.post("/api/u-examinations/complete", json={"exam_name": "U1"})),
+        ("POST /api/import", "/api/import", lambda: client.post("/api/import", data=growth_row))
+    ]
+    return benchmarks
+
+
+def measure(function, repeat, before=None):
+    """
+    Time a function
+
+    Args:
+        function: Callable to time
+        repeat: Number of timed runs (after one warm-up run)
+        before: Optional untimed callable run before every call
+
+    Returns:
+        dict: Median and minimum duration in ms
+    """
+    timings = []
+    for run in range(repeat + 1):
+        if before:
+            before()
+        start = time.perf_counter()
+        function()
+        if run:
+            timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(timings), 3), "min_ms": round(min(timings), 3)}
+
+
+def uncovered(expected, covered, skipped):
+    """Names that are neither benchmarked nor explicitly skipped"""
+    return sorted(set(expected) - set(covered) - set(skipped))
+
+
+def run_size(directory, years, seed, repeat, engine, routes):
+    """
+    Benchmark one data size
+
+    Returns:
+        dict: Record counts and timings keyed by benchmark name
+    """
+    print(f"Generating {years} year(s) of history...")
+    sensor, import_ms, rows = load_history(directory, years, seed, engine)
+    counts = {}
+    for row in rows:
+        counts[row["section"]] = counts.get(row["section"], 0) + 1
+    print(f"  Records: {counts} (import {import_ms:.0f} ms)")
+
+    # Every call is timed without the summary cache of the previous run
+    reset = sensor._cache.invalidate
+    timings = {"setup.import_records": {"median_ms": round(import_ms, 3), "min_ms": round(import_ms, 3)}}
+
+    benchmarks = sensor_benchmarks(sensor)
+    public = [
+        name for name in vars(EarlyBirdSensor)
+        if not name.startswith("_") and callable(getattr(EarlyBirdSensor, name))
+    ]
+    missing = uncovered(public, [name.split("[")[0] for name, _ in benchmarks], NOT_BENCHMARKED)
+    if missing:
+        print(f"  ! Sensor methods without benchmark: {', '.join(missing)}")
+    for name, function in benchmarks:
+        timings[f"sensor.{name}"] = measure(function, repeat, reset)
+
+    if routes:
+        import run
+        run.sensor = sensor
+        run.startup["state"] = "ready"
+        run.ready.set()
+        client = run.app.test_client()
+        benchmarks = route_benchmarks(client)
+        rules = [rule.rule for rule in run.app.url_map.iter_rules()]
+        missing = uncovered(rules, [rule for _, rule, _ in benchmarks], NOT_BENCHMARKED_ROUTES)
+        if missing:
+            print(f"  ! Routes without benchmark: {', '.join(missing)}")
+        for name, _, function in benchmarks:
+            status = function().status_code
+            if status >= 400:
+                print(f"  ! {name} answered {status}")
+            timings[f"route.{name}"] = measure(lambda: function().get_data(), repeat, reset)
+        run.sensor = None
+
+    sensor.close()
+    return {"records": counts, "timings": timings}
+
+
+def print_results(results):
+    """Print the timings of every size side by side"""
+    sizes = list(results)
+    names = sorted({name for size in sizes for name in results[size]["timings"]})
+    print(f"{'benchmark (median ms)':<60}" + "".join(f"{size:>10}" for size in sizes))
+    for name in names:
+        values = [results[size]["timings"].get(name, {}).get("median_ms") for size in sizes]
+        print(f"{name:<60}" + "".join(f"{v:>10.2f}" if v is not None else f"{'-':>10}" for v in values))
+    print()
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """
+    Compare timings with a baseline
+
+    A benchmark regresses when its median is more than `threshold` slower
+    and at least `min_delta_ms` slower than in the baseline.
+
+    Returns:
+        list: (size, name, baseline ms, current ms) of every regression
+    """
+    regressions = []
+    for size, result in results.items():
+        previous = baseline.get("results", {}).get(size)
+        if not previous:
+            print(f"  No baseline for {size}")
+            continue
+        for name, timing in sorted(result["timings"].items()):
+            before = previous["timings"].get(name)
+            if not before:
+                continue
+            current, old = timing["median_ms"], before["median_ms"]
+            if current > old * (1 + threshold) and current - old >= min_delta_ms:
+                regressions.append((size, name, old, current))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Early Bird sensor and API")
+    parser.add_argument("--years", type=float, nargs="+", default=[1, 3, 5], help="History lengths to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the history generator")
+    parser.add_argument("--engine", choices=["json", "sqlite"], default="json", help="Storage engine")
+    parser.add_argument("--no-routes", action="store_true", help="Only benchmark sensor methods")
+    parser.add_argument("--save", metavar="FILE", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="Compare with a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Ignore slowdowns below this many ms")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Early Bird Benchmark")
+    print("=" * 60 + "\n")
+
+    directory = tempfile.mkdtemp(prefix="early_bird_bench_")
+    try:
+        results = {}
+        for years in args.years:
+            size = f"{years:g}y"
+            results[size] = run_size(directory, years, args.seed, args.repeat, args.engine, not args.no_routes)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print_results(results)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "engine": args.engine,
+                "seed": args.seed,
+                "repeat": args.repeat,
+                "results": results
+            }, f, indent=2)
+        print(f"Baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"✗ {len(regressions)} regression(s) against {args.compare}:")
+            for size, name, old, current in regressions:
+                print(f"  {size} {name}: {old:.2f} ms -> {current:.2f} ms ({current / old:.1f}x)")
+            return 1
+        print(f"✓ No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
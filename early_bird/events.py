@@ -0,0 +1,124 @@
+"""
+Early Bird Events - Server-Sent Events change stream
+One shared broadcaster fans out data changes and day rollovers to all clients
+"""
+import json
+import queue
+import threading
+import time
+
+
+class ChangeBroadcaster:
+    """Broadcasts change events to all connected stream clients"""
+
+    # Seconds between keep-alive comments on idle connections
+    KEEPALIVE_SECONDS = 15
+
+    # Seconds between checks for a day rollover and for changes of other workers
+    WATCH_SECONDS = 5
+
+    # Events buffered per client before it is considered gone
+    MAX_QUEUED_EVENTS = 100
+
+    def __init__(self, day_source=None, max_clients=None, poll=None):
+        """
+        Initialize the broadcaster
+
+        Args:
+            day_source: Optional callable returning the current corrected-age
+                day; a "day" event is published whenever its value changes
+            max_clients: Optional limit of concurrently connected clients
+            poll: Optional callable run on every watch interval while clients
+                are connected, e.g. to pick up changes of other processes
+        """
+        self.day_source = day_source
+        self.max_clients = max_clients
+        self.poll = poll
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    @property
+    def client_count(self):
+        """Number of connected clients"""
+        with self._lock:
+            return len(self._clients)
+
+    @property
+    def is_full(self):
+        """Whether the client limit is reached"""
+        return self.max_clients is not None and self.client_count >= self.max_clients
+
+    def publish(self, event, data):
+        """
+        Send an event to all connected clients
+
+        Args:
+            event: Event name (e.g. "change", "day")
+            data: JSON-serializable payload
+        """
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.put_nowait(message)
+            except queue.Full:
+                # Client stopped reading; drop it, its stream ends on the next read
+                self._unsubscribe(client)
+
+    def publish_change(self, section, data_version):
+        """Publish a data change of one section"""
+        self.publish("change", {"section": section, "data_version": data_version})
+
+    def stream(self):
+        """
+        Generate the SSE stream for one client
+
+        Yields:
+            str: SSE-formatted messages and keep-alive comments
+        """
+        client = queue.Queue(maxsize=self.MAX_QUEUED_EVENTS)
+        with self._lock:
+            self._clients.add(client)
+        self._start_watcher()
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    yield client.get(timeout=self.KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    with self._lock:
+                        if client not in self._clients:
+                            return
+        finally:
+            self._unsubscribe(client)
+
+    def _unsubscribe(self, client):
+        """Remove a client"""
+        with self._lock:
+            self._clients.discard(client)
+
+    def _start_watcher(self):
+        """Start the shared watcher thread once"""
+        if not self.day_source and not self.poll:
+            return
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(target=self._watch, daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        """Run the poll callable and publish a "day" event on day rollovers"""
+        current_day = self.day_source() if self.day_source else None
+        while True:
+            time.sleep(self.WATCH_SECONDS)
+            if self.poll and self.client_count:
+                self.poll()
+            if self.day_source:
+                day = self.day_source()
+                if day != current_day:
+                    current_day = day
+                    self.publish("day", {"corrected_day": day})
@@ -0,0 +1,207 @@
+"""
+Early Bird Exchange - Streaming export and import of stored records
+Records are written and parsed one line at a time so large histories never
+have to be held in memory as a single document
+"""
+import csv
+import io
+import json
+import math
+from datetime import datetime
+
+
+# Exported sections and their CSV columns
+EXPORT_FIELDS = {
+    "growth_records": [
+        "seq", "date", "corrected_age_weeks", "actual_age_weeks",
+        "weight_kg", "height_cm", "head_circumference_cm"
+    ],
+    "milestone_achievements": [
+        "seq", "date", "corrected_age_weeks", "category", "milestone", "notes"
+    ],
+    "sleep_records": [
+        "seq", "date", "corrected_age_weeks", "sleep_type", "start_time",
+        "end_time", "duration_hours", "quality", "notes"
+    ],
+    "u_examinations_records": [
+        "seq", "date", "corrected_age_weeks", "exam_name", "notes"
+    ]
+}
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# Rows written per yielded chunk
+CHUNK_ROWS = 200
+
+
+def csv_columns(sections):
+    """
+    Get the CSV header for a set of sections
+
+    Args:
+        sections: Exported sections
+
+    Returns:
+        list: "section" followed by the union of the section columns
+    """
+    columns = ["section"]
+    for section in sections:
+        columns.extend(c for c in EXPORT_FIELDS[section] if c not in columns)
+    return columns
+
+
+def export_records(data, sections, fmt="ndjson"):
+    """
+    Stream records of the given sections
+
+    Args:
+        data: Data dictionary
+        sections: Sections to export, in output order
+        fmt: "ndjson" (one JSON object per line) or "csv"
+
+    Yields:
+        str: Chunks of at most CHUNK_ROWS lines
+    """
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.DictWriter(buffer, csv_columns(sections), extrasaction="ignore")
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(row):
+            buffer.write(json.dumps(row, ensure_ascii=False))
+            buffer.write("\n")
+
+    rows = 0
+    for section in sections:
+        for record in data.get(section, []):
+            write({"section": section, **record})
+            rows += 1
+            if rows % CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _text(value):
+    """Convert a field to stripped text"""
+    return str(value).strip()
+
+
+def _datetime(value):
+    """Parse an ISO date or datetime; aware values are converted to local time"""
+    parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    if parsed.tzinfo:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def _measurement(value):
+    """Parse a measurement, which must be a finite positive number"""
+    parsed = float(value)
+    if not math.isfinite(parsed) or parsed <= 0:
+        raise ValueError(f"Not a positive number: {value}")
+    return parsed
+
+
+# Imported fields per section: (converter, required)
+IMPORT_FIELDS = {
+    "growth_records": {
+        "date": (_datetime, True),
+        "weight_kg": (_measurement, True),
+        "height_cm": (_measurement, True),
+        "head_circumference_cm": (_measurement, False)
+    },
+    "milestone_achievements": {
+        "date": (_datetime, True),
+        "category": (_text, True),
+        "milestone": (_text, True),
+        "notes": (_text, False)
+    },
+    "sleep_records": {
+        "sleep_type": (_text, True),
+        "start_time": (_datetime, True),
+        "end_time": (_datetime, True),
+        "quality": (_text, False),
+        "notes": (_text, False)
+    },
+    "u_examinations_records": {
+        "exam_name": (_text, True),
+        "date": (_datetime, True),
+        "notes": (_text, False)
+    }
+}
+
+
+def read_rows(lines, fmt="ndjson"):
+    """
+    Parse an import document line by line
+
+    Args:
+        lines: Iterable of text lines
+        fmt: "ndjson" or "csv"
+
+    Yields:
+        tuple: (line number, row dict), or (line number, ValueError) for
+            lines that cannot be parsed
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        try:
+            for row in reader:
+                yield reader.line_num, row
+        except csv.Error as e:
+            yield reader.line_num, ValueError(f"Invalid CSV: {e}")
+        return
+
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, ValueError(f"Invalid JSON: {e.msg}")
+            continue
+        if not isinstance(row, dict):
+            yield line_no, ValueError("Line is not a JSON object")
+            continue
+        yield line_no, row
+
+
+def parse_row(row, default_section=None):
+    """
+    Validate an import row and convert its fields
+
+    Args:
+        row: Row dict from read_rows
+        default_section: Section for rows without a "section" field
+
+    Returns:
+        tuple: (section, fields) with converted values; missing optional
+            fields are omitted
+
+    Raises:
+        ValueError: If the section is unknown or a field is missing or invalid
+    """
+    section = row.get("section") or default_section
+    if section not in IMPORT_FIELDS:
+        raise ValueError(f"Unknown section: {section}")
+
+    fields = {}
+    for name, (convert, required) in IMPORT_FIELDS[section].items():
+        value = row.get(name)
+        if value is None or value == "":
+            if required:
+                raise ValueError(f"Missing field: {name}")
+            continue
+        try:
+            fields[name] = convert(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {name}: {value}")
+    return section, fields
@@ -0,0 +1,478 @@
+"""
+Early Bird Indexes - In-memory indexes over stored records
+Kept up to date by the sensor so queries do not rescan the full history
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+
+class SleepIndex:
+    """Sleep records sorted by day and start time with pre-parsed keys"""
+
+    def __init__(self, records=()):
+        """
+        Build the index
+
+        Args:
+            records: Sleep records in insertion order
+        """
+        self._keys = []
+        self._days = []
+        self._records = []
+        self._seq = 0
+        for record in records:
+            self.add(record)
+
+    def __len__(self):
+        return len(self._records)
+
+    def copy(self):
+        """Copy the index for the next data snapshot"""
+        index = SleepIndex()
+        index._keys = list(self._keys)
+        index._days = list(self._days)
+        index._records = list(self._records)
+        index._seq = self._seq
+        return index
+
+    def add(self, record):
+        """
+        Insert a sleep record at its sorted position
+
+        Args:
+            record: Sleep record with "date" and "start_time"
+        """
+        day = datetime.fromisoformat(record["date"]).toordinal()
+        start = datetime.fromisoformat(record["start_time"]).timestamp()
+        # Equal start times keep insertion order when read newest-first
+        key = (day, start, -self._seq)
+        self._seq += 1
+
+        position = bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._days.insert(position, day)
+        self._records.insert(position, record)
+
+    def between(self, start_date, end_date):
+        """
+        Get records whose day lies in a date range
+
+        Args:
+            start_date: First day (date, inclusive)
+            end_date: Last day (date, inclusive)
+
+        Returns:
+            list: Records in chronological order
+        """
+        lo = bisect_left(self._days, start_date.toordinal())
+        hi = bisect_right(self._days, end_date.toordinal())
+        return self._records[lo:hi]
+
+    def latest(self, limit):
+        """
+        Get the most recent records
+
+        Args:
+            limit: Maximum number of records
+
+        Returns:
+            list: Records, newest first
+        """
+        if limit < 0:
+            return self._records[::-1][:limit]
+        return self._records[:-limit - 1:-1]
+
+
+class SleepRollups:
+    """Per-day sleep aggregates maintained incrementally on insert"""
+
+    # Hours are summed as integer hundredths (the precision of duration_hours),
+    # so totals do not depend on how records are grouped into days
+    UNIT = "centihours"
+
+    def __init__(self, state, records=()):
+        """
+        Attach to persisted rollup state and fold in records not yet counted
+
+        Args:
+            state: Persisted rollup dictionary (mutated in place)
+            records: All sleep records in insertion order
+        """
+        self.state = state
+        if state.get("unit") != self.UNIT:
+            # State of an older version with float hour sums is rebuilt
+            state.clear()
+            state["unit"] = self.UNIT
+        state.setdefault("records", 0)
+        state.setdefault("days", {})
+        # Records replayed from the journal after the last snapshot
+        for record in records[state["records"]:]:
+            self.add(record)
+
+    def add(self, record):
+        """
+        Fold a sleep record into its day bucket
+
+        Args:
+            record: Sleep record
+        """
+        # Buckets are replaced, not modified, so copies can share them
+        day = self.state["days"].get(record["date"]) or {
+            "count": 0,
+            "total_centihours": 0,
+            "night_centihours": 0,
+            "nights": 0,
+            "naps": 0,
+            "quality_distribution": {"poor": 0, "normal": 0, "good": 0}
+        }
+        day = dict(day, quality_distribution=dict(day["quality_distribution"]))
+        self.state["days"][record["date"]] = day
+        centihours = round(record["duration_hours"] * 100)
+        day["count"] += 1
+        day["total_centihours"] += centihours
+        if record["sleep_type"] == "night":
+            day["night_centihours"] += centihours
+            day["nights"] += 1
+        elif record["sleep_type"] == "nap":
+            day["naps"] += 1
+        quality = record.get("quality", "normal")
+        day["quality_distribution"][quality] = day["quality_distribution"].get(quality, 0) + 1
+        self.state["records"] += 1
+
+    def copy(self):
+        """Copy the rollups for the next data snapshot"""
+        return SleepRollups({
+            "unit": self.UNIT,
+            "records": self.state["records"],
+            "days": dict(self.state["days"])
+        })
+
+    def totals(self, start_date, end_date):
+        """
+        Sum the day buckets in a date range
+
+        Args:
+            start_date: First day (date, inclusive)
+            end_date: Last day (date, inclusive)
+
+        Returns:
+            dict: Record count, totals in hundredths of an hour, night/nap
+                counts and quality distribution
+        """
+        days = self.state["days"]
+        span = (end_date - start_date).days + 1
+        if span <= len(days):
+            keys = [(start_date + timedelta(days=offset)).isoformat() for offset in range(max(span, 0))]
+        else:
+            first, last = start_date.isoformat(), end_date.isoformat()
+            keys = [key for key in days if first <= key <= last]
+
+        totals = {
+            "count": 0,
+            "total_centihours": 0,
+            "night_centihours": 0,
+            "nights": 0,
+            "naps": 0,
+            "quality_distribution": {"poor": 0, "normal": 0, "good": 0}
+        }
+        for key in keys:
+            day = days.get(key)
+            if not day:
+                continue
+            for field in ("count", "total_centihours", "night_centihours", "nights", "naps"):
+                totals[field] += day[field]
+            distribution = totals["quality_distribution"]
+            for quality, count in day["quality_distribution"].items():
+                distribution[quality] = distribution.get(quality, 0) + count
+        return totals
+
+
+class SortedEvents:
+    """Events kept sorted by (date, source order, insertion order)"""
+
+    def __init__(self):
+        self._keys = []
+        self._events = []
+
+    def __len__(self):
+        return len(self._events)
+
+    def copy(self):
+        """Copy the sorted events"""
+        events = SortedEvents()
+        events._keys = list(self._keys)
+        events._events = list(self._events)
+        return events
+
+    def add(self, key, event):
+        """Insert an event at its sorted position"""
+        position = bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._events.insert(position, event)
+
+    def ascending(self):
+        """Get events oldest first"""
+        return list(self._events)
+
+    def descending(self):
+        """Get events newest first; events on the same date keep their order"""
+        events = []
+        end = len(self._events)
+        while end > 0:
+            start = end - 1
+            date = self._keys[start][0]
+            while start > 0 and self._keys[start - 1][0] == date:
+                start -= 1
+            events.extend(self._events[start:end])
+            end = start
+        return events
+
+
+    def page(self, limit, after=None, descending=True):
+        """
+        Get one page of events following a position
+
+        Args:
+            limit: Maximum number of events
+            after: Key of the last event of the previous page, or None
+            descending: Newest first if True
+
+        Returns:
+            tuple: (events, key of the last returned event or None when done)
+        """
+        if not descending:
+            start = bisect_right(self._keys, after) if after is not None else 0
+            end = min(start + limit, len(self._events))
+            last = self._keys[end - 1] if end < len(self._events) and end > start else None
+            return self._events[start:end], last
+
+        positions = []
+        if after is None:
+            group_end = len(self._keys)
+        else:
+            # Rest of the cursor's date group, which is listed oldest first
+            date = after[0]
+            group_start = bisect_left(self._keys, (date,))
+            group_end = bisect_right(self._keys, (date, float("inf")))
+            positions.extend(range(bisect_right(self._keys, after), group_end)[:limit])
+            group_end = group_start
+
+        while len(positions) < limit and group_end > 0:
+            date = self._keys[group_end - 1][0]
+            group_start = bisect_left(self._keys, (date,))
+            positions.extend(range(group_start, group_end)[:limit - len(positions)])
+            group_end = group_start
+
+        has_more = bool(positions) and (
+            group_end > 0 or positions[-1] + 1 < len(self._keys)
+            and self._keys[positions[-1] + 1][0] == self._keys[positions[-1]][0]
+        )
+        last = self._keys[positions[-1]] if has_more else None
+        return [self._events[i] for i in positions], last
+
+
+class Timeline:
+    """Materialized pride archive timeline maintained on insert"""
+
+    # Event types in the order they are listed for equal dates
+    SOURCES = {
+        "milestone_achievements": "milestone",
+        "growth_records": "growth",
+        "u_examinations_records": "u_examination"
+    }
+
+    def __init__(self, format_event, data=None):
+        """
+        Build the timeline
+
+        Args:
+            format_event: Callable (event_type, record) -> event dict
+            data: Optional data dictionary with the source sections
+        """
+        self.format_event = format_event
+        self._all = SortedEvents()
+        self._by_category = {}
+        self._by_month = {}
+        self._category_counts = {}
+        self._month_category_counts = {}
+        self._bounds = {}
+        # Category and month lists still shared with the timeline this was copied from
+        self._shared = set()
+        for section in self.SOURCES:
+            for record in (data or {}).get(section, []):
+                self.add(section, record)
+
+    def add(self, section, record):
+        """
+        Add a stored record to the timeline
+
+        Args:
+            section: Source section (e.g. "growth_records")
+            record: Stored record with its sequence number
+        """
+        event_type = self.SOURCES[section]
+        event = self.format_event(event_type, record)
+        category = event["category"]
+        parsed = datetime.fromisoformat(event["date"])
+        month = (parsed.year, parsed.month)
+
+        # The stored sequence number keeps keys, and so cursors, the same after a restart
+        key = (event["date"], list(self.SOURCES.values()).index(event_type), record["seq"])
+
+        self._all.add(key, event)
+        self._scope_events(self._by_category, category).add(key, event)
+        self._scope_events(self._by_month, month).add(key, event)
+
+        self._category_counts[category] = self._category_counts.get(category, 0) + 1
+        month_counts = self._month_category_counts.setdefault(month, {})
+        month_counts[category] = month_counts.get(category, 0) + 1
+
+        for scope in (None, category):
+            bounds = self._bounds.get(scope)
+            if bounds is None:
+                self._bounds[scope] = [parsed, parsed]
+            else:
+                bounds[0] = min(bounds[0], parsed)
+                bounds[1] = max(bounds[1], parsed)
+
+    def copy(self):
+        """Copy the timeline for the next data snapshot"""
+        timeline = Timeline(self.format_event)
+        timeline._all = self._all.copy()
+        # Category and month lists are only copied once something is added to them
+        timeline._by_category = dict(self._by_category)
+        timeline._by_month = dict(self._by_month)
+        timeline._shared = set(self._by_category) | set(self._by_month)
+        timeline._category_counts = dict(self._category_counts)
+        timeline._month_category_counts = {
+            month: dict(counts) for month, counts in self._month_category_counts.items()
+        }
+        timeline._bounds = {scope: list(bounds) for scope, bounds in self._bounds.items()}
+        return timeline
+
+    def _scope_events(self, scopes, scope):
+        """Get the sorted events of a category or month, ready to be added to"""
+        events = scopes.get(scope)
+        if events is None:
+            events = scopes[scope] = SortedEvents()
+        elif scope in self._shared:
+            events = scopes[scope] = events.copy()
+            self._shared.discard(scope)
+        return events
+
+    def events(self, category=None, descending=True):
+        """
+        Get timeline events
+
+        Args:
+            category: Optional category filter
+            descending: Newest first if True
+
+        Returns:
+            list: Events
+        """
+        events = self._all if category is None else self._by_category.get(category, SortedEvents())
+        return events.descending() if descending else events.ascending()
+
+    def page(self, limit, after=None, category=None, descending=True):
+        """
+        Get one page of timeline events
+
+        Args:
+            limit: Maximum number of events
+            after: Key of the last event of the previous page, or None
+            category: Optional category filter
+            descending: Newest first if True
+
+        Returns:
+            tuple: (events, key of the last returned event or None when done)
+        """
+        events = self._all if category is None else self._by_category.get(category, SortedEvents())
+        return events.page(limit, after, descending)
+
+    def category_counts(self, category=None):
+        """Get event counts per category, optionally for a single category"""
+        if category is None:
+            return dict(self._category_counts)
+        count = self._category_counts.get(category, 0)
+        return {category: count} if count else {}
+
+    def date_range(self, category=None):
+        """Get first and last event date, optionally for a single category"""
+        bounds = self._bounds.get(category)
+        if bounds is None:
+            return {"start": None, "end": None}
+        return {"start": bounds[0].isoformat(), "end": bounds[1].isoformat()}
+
+    def month(self, year, month):
+        """
+        Get events and category counts of a month
+
+        Args:
+            year: Year
+            month: Month (1-12)
+
+        Returns:
+            tuple: (events newest first, category counts)
+        """
+        events = self._by_month.get((year, month), SortedEvents())
+        return events.descending(), dict(self._month_category_counts.get((year, month), {}))
+
+
+class ChangeFeed:
+    """Records of all sections ordered by their sequence number"""
+
+    def __init__(self, data=None):
+        """
+        Build the feed
+
+        Args:
+            data: Optional data dictionary; records without a sequence number
+                are numbered in a stable order ahead of all others
+        """
+        self._seqs = []
+        self._changes = []
+        records = [
+            (section, record)
+            for section in sorted(data or {})
+            if isinstance(data[section], list)
+            for record in data[section]
+            if isinstance(record, dict)
+        ]
+        legacy = [record for _, record in records if "seq" not in record]
+        for seq, record in enumerate(legacy, 1):
+            record["seq"] = seq
+        for section, record in sorted(records, key=lambda item: item[1]["seq"]):
+            self.add(section, record)
+
+    def copy(self):
+        """Copy the feed for the next data snapshot"""
+        feed = ChangeFeed()
+        feed._seqs = list(self._seqs)
+        feed._changes = list(self._changes)
+        return feed
+
+    @property
+    def head(self):
+        """Sequence number of the latest record (0 if empty)"""
+        return self._seqs[-1] if self._seqs else 0
+
+    def add(self, section, record):
+        """Add a record carrying a sequence number above the current head"""
+        self._seqs.append(record["seq"])
+        self._changes.append({"seq": record["seq"], "section": section, "record": record})
+
+    def since(self, seq, limit=None):
+        """
+        Get records added after a sequence number
+
+        Args:
+            seq: Last sequence number the client has seen
+            limit: Optional maximum number of changes
+
+        Returns:
+            list: Changes ({"seq", "section", "record"}) in sequence order
+        """
+        start = bisect_right(self._seqs, seq)
+        end = len(self._changes) if limit is None else start + limit
+        return self._changes[start:end]
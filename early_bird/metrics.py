@@ -0,0 +1,219 @@
+"""
+Early Bird Metrics - Counters and histograms in Prometheus text format
+Kept dependency-free and cheap enough to time every request and sensor call
+"""
+import functools
+import threading
+import time
+import types
+from bisect import bisect_left
+from contextlib import contextmanager
+
+
+def _escape(value):
+    """Escape a label value"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    """Format a label set as {name="value",...}"""
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    """Format a sample value"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonically increasing value per label set"""
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """Increase the counter of a label set"""
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        """Get the sample lines"""
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Gauge:
+    """Value per label set read from a callback at scrape time"""
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, collect, labels=()):
+        """
+        Initialize the gauge
+
+        Args:
+            collect: Callable returning {label value tuple: value}
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.collect = collect
+
+    def render(self):
+        """Get the sample lines"""
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in sorted(self.collect().items())
+        ]
+
+
+class CallbackCounter(Gauge):
+    """Counter read from a callback at scrape time, for totals kept elsewhere"""
+
+    type = "counter"
+
+
+class Histogram:
+    """Bucketed distribution of observed values per label set"""
+
+    type = "histogram"
+
+    # Latency buckets in seconds
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket (last is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Record one observation"""
+        key = tuple(labels[name] for name in self.labels)
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [[0] * (len(self.buckets) + 1), 0]
+            counts[0][position] += 1
+            counts[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        """Get the cumulative bucket, sum and count lines"""
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        lines = []
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labels, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add a metric, replacing one with the same name"""
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        """
+        Render all metrics
+
+        Returns:
+            str: Prometheus text exposition format
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def instrument_methods(cls, histogram):
+    """
+    Time every public method of a class
+
+    Args:
+        cls: Class whose public functions are wrapped in place
+        histogram: Histogram with a "method" label
+    """
+    for name, function in list(vars(cls).items()):
+        if name.startswith("_") or not isinstance(function, types.FunctionType):
+            continue
+
+        def timed(function=function, name=name):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start, method=name)
+            return wrapper
+
+        setattr(cls, name, timed())
+
+
+REGISTRY = Registry()
+
+SENSOR_CALL_SECONDS = REGISTRY.register(Histogram(
+    "early_bird_sensor_call_duration_seconds",
+    "Duration of EarlyBirdSensor method calls",
+    labels=("method",)
+))
+
+STORAGE_WRITE_SECONDS = REGISTRY.register(Histogram(
+    "early_bird_storage_write_duration_seconds",
+    "Duration of storage writes (append: journal or database commit, snapshot: full rewrite)",
+    labels=("engine", "kind")
+))
+
+STORAGE_WRITE_BYTES = REGISTRY.register(Counter(
+    "early_bird_storage_written_bytes_total",
+    "Bytes written by storage writes",
+    labels=("engine", "kind")
+))
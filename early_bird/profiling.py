@@ -0,0 +1,136 @@
+"""
+Early Bird Profiling - Opt-in cProfile capture of single requests
+Profiles are stored as .prof files with a plain-text report of the hottest
+functions, so slow endpoints can be analysed on the real installation
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+from datetime import datetime
+
+
+class RequestProfiler:
+    """Profiles requests and keeps the most recent results on disk"""
+
+    # Stored profiles; older ones are deleted
+    MAX_PROFILES = 50
+    # Functions listed in the text report
+    TOP_FUNCTIONS = 40
+
+    def __init__(self, directory, max_profiles=None, top=None):
+        """
+        Initialize the profiler
+
+        Args:
+            directory: Directory for .prof files and reports
+            max_profiles: Optional override for MAX_PROFILES
+            top: Optional override for TOP_FUNCTIONS
+        """
+        self.directory = directory
+        self.max_profiles = max_profiles or self.MAX_PROFILES
+        self.top = top or self.TOP_FUNCTIONS
+        # Only one profiler can be active per process
+        self._active = threading.Lock()
+
+    def start(self):
+        """
+        Start profiling the current thread
+
+        Returns:
+            cProfile.Profile, or None if another request is being profiled
+        """
+        if not self._active.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) is already active
+            self._active.release()
+            return None
+        return profile
+
+    def stop(self, profile):
+        """Stop a profile returned by start() without saving it"""
+        profile.disable()
+        self._active.release()
+
+    def save(self, profile, method, path, status, duration_ms):
+        """
+        Stop a profile and store it with its text report
+
+        Args:
+            profile: Profile returned by start()
+            method: HTTP method
+            path: Request path including the query string
+            status: Response status code
+            duration_ms: Request duration in milliseconds
+
+        Returns:
+            str: Profile id (file name without extension)
+        """
+        self.stop(profile)
+        now = datetime.now()
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", path.split("?")[0]).strip("-") or "root"
+        profile_id = f"{now.strftime('%Y%m%d-%H%M%S-%f')}_{method}_{slug}"
+
+        os.makedirs(self.directory, exist_ok=True)
+        profile.dump_stats(os.path.join(self.directory, profile_id + ".prof"))
+
+        report = io.StringIO()
+        report.write(f"{method} {path} -> {status} in {duration_ms:.1f} ms\n")
+        stats = pstats.Stats(profile, stream=report)
+        stats.sort_stats("cumulative").print_stats(self.top)
+        with open(os.path.join(self.directory, profile_id + ".txt"), 'w') as f:
+            f.write(report.getvalue())
+
+        self._prune()
+        return profile_id
+
+    def recent(self, limit=20):
+        """
+        Get the most recent stored profiles
+
+        Args:
+            limit: Maximum number of profiles
+
+        Returns:
+            list: Newest first, with id, request summary and file names
+        """
+        profiles = []
+        for profile_id in self._profile_ids()[:limit]:
+            report_file = os.path.join(self.directory, profile_id + ".txt")
+            try:
+                with open(report_file, 'r') as f:
+                    summary = f.readline().strip()
+            except OSError:
+                summary = None
+            profiles.append({
+                "id": profile_id,
+                "created": datetime.strptime(profile_id[:22], "%Y%m%d-%H%M%S-%f").isoformat(),
+                "request": summary,
+                "prof": profile_id + ".prof",
+                "report": profile_id + ".txt"
+            })
+        return profiles
+
+    def _profile_ids(self):
+        """Stored profile ids, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            (name[:-5] for name in os.listdir(self.directory) if name.endswith(".prof")),
+            reverse=True
+        )
+
+    def _prune(self):
+        """Delete profiles beyond max_profiles"""
+        for profile_id in self._profile_ids()[self.max_profiles:]:
+            for extension in (".prof", ".txt"):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + extension))
+                except FileNotFoundError:
+                    pass
@@ -2,23 +2,47 @@
 Early Bird - Main application runner
 Flask web server for the Early Bird Home Assistant addon
 """
+import time
+
+# Reference for the startup timings reported by /health
+PROCESS_START = time.perf_counter()
+
+import codecs
+import hashlib
 import json
 import os
-from flask import Flask, render_template, jsonify, request
+import signal
+import socket
+import sys
+import threading
+from flask import Flask, Response, render_template, jsonify, request, g, send_from_directory
+from events import ChangeBroadcaster
+from exchange import EXPORT_FORMATS
+from metrics import REGISTRY, CallbackCounter, Counter, Gauge, Histogram
+from profiling import RequestProfiler
 from sensor import EarlyBirdSensor
 from datetime import datetime
 
 app = Flask(__name__)
 
+# Home Assistant mounts the addon data at /data; overridable for local runs
+DATA_DIR = os.environ.get('EARLY_BIRD_DATA_DIR', '/data')
+
 # Helper function to get ingress path
 def get_ingress_path():
     """Get the ingress path from Home Assistant headers"""
     return request.headers.get('X-Ingress-Path', '')
 
+def request_context():
+    """Get the sensor evaluation context shared by the current request"""
+    if 'sensor_context' not in g:
+        g.sensor_context = sensor.create_context()
+    return g.sensor_context
+
 # Load configuration from Home Assistant
 def load_config():
     """Load configuration from options.json"""
-    config_file = '/data/options.json'
+    config_file = os.path.join(DATA_DIR, 'options.json')
     if os.path.exists(config_file):
         with open(config_file, 'r') as f:
             return json.load(f)
@@ -27,20 +51,299 @@ def load_config():
         "birth_date": "2024-01-01",
         "due_date": "2024-03-01",
         "language": "de",
-        "notifications_enabled": True
+        "notifications_enabled": True,
+        "storage_engine": "json",
+        "flush_interval_ms": 0,
+        "server": "production",
+        "server_threads": 8,
+        "server_connection_limit": 100,
+        "server_backlog": 64,
+        "server_keepalive_timeout": 120,
+        "server_workers": 1,
+        "profiling": False
     }
 
 config = load_config()
 
-# Initialize sensor
+# Worker processes share the data files; write-behind would hold back
+# records the other workers need to see
+workers = config.get('server_workers', 1) if config.get('server', 'production') == 'production' else 1
+worker_pids = []
+
 sensor = None
-if config.get('birth_date') and config.get('due_date'):
+broadcaster = None
+
+# Startup state of this process: the server answers while the data loads
+startup = {"state": "starting", "error": None, "timings": {}}
+ready = threading.Event()
+
+def mark_startup(phase):
+    """Record the milliseconds from process start to a startup phase"""
+    startup["timings"][phase] = round((time.perf_counter() - PROCESS_START) * 1000, 1)
+
+mark_startup("imports")
+
+def init_sensor():
+    """Create the sensor and the shared change stream of this process"""
+    global sensor, broadcaster
+    if not (config.get('birth_date') and config.get('due_date')):
+        return
     sensor = EarlyBirdSensor(
         child_name=config.get('child_name', 'Baby'),
         birth_date=config['birth_date'],
         due_date=config['due_date'],
-        data_file='/data/child_data.json'
+        data_file=os.path.join(DATA_DIR, 'child_data.json'),
+        storage_engine=config.get('storage_engine', 'json'),
+        flush_interval_ms=config.get('flush_interval_ms', 0) if workers == 1 else 0
+    )
+
+    # Every open stream holds a server thread; keep two for regular requests
+    max_streams = None
+    if config.get('server', 'production') == 'production':
+        max_streams = max(1, config.get('server_threads', 8) - 2)
+    broadcaster = ChangeBroadcaster(
+        day_source=sensor.get_corrected_day,
+        max_clients=max_streams,
+        # Streams of this worker also report records added by other workers
+        poll=sensor.refresh if workers > 1 else None
     )
+    sensor.add_change_listener(broadcaster.publish_change)
+
+def load_data():
+    """Load the sensor data and mark this process ready"""
+    start = time.perf_counter()
+    try:
+        init_sensor()
+        startup["state"] = "ready"
+    except Exception as e:
+        startup["state"] = "error"
+        startup["error"] = str(e)
+        raise
+    finally:
+        startup["timings"]["data_load"] = round((time.perf_counter() - start) * 1000, 1)
+        mark_startup("ready")
+        ready.set()
+        print(f"Early Bird {startup['state']} after {startup['timings']['ready']} ms "
+              f"(data loaded in {startup['timings']['data_load']} ms)", flush=True)
+
+def start_loading():
+    """Load the data in the background so the server can answer right away"""
+    threading.Thread(target=load_data, name="early-bird-startup", daemon=True).start()
+
+def handle_sigterm(signum, frame):
+    """Flush pending writes when the Supervisor stops the addon"""
+    for pid in worker_pids:
+        os.kill(pid, signal.SIGTERM)
+    if sensor:
+        sensor.close()
+    sys.exit(0)
+
+signal.signal(signal.SIGTERM, handle_sigterm)
+
+# Request metrics
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "early_bird_http_requests_total",
+    "HTTP requests by endpoint and status",
+    labels=("method", "endpoint", "status")
+))
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "early_bird_http_request_duration_seconds",
+    "HTTP request duration until the response is returned (first byte for streams)",
+    labels=("method", "endpoint")
+))
+
+HTTP_RESPONSE_BYTES = REGISTRY.register(Histogram(
+    "early_bird_http_response_size_bytes",
+    "HTTP response body size of responses with a known length",
+    labels=("endpoint",),
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+))
+
+def collect_records():
+    """Record count per data section"""
+    if not sensor:
+        return {}
+    return {(section,): count for section, count in sensor.data.record_counts().items()}
+
+def collect_cache_lookups():
+    """Summary cache hits and misses"""
+    if not sensor:
+        return {}
+    stats = sensor.get_cache_stats()
+    return {("hit",): stats["hits"], ("miss",): stats["misses"]}
+
+REGISTRY.register(Gauge(
+    "early_bird_records", "Stored records per section", collect_records, labels=("section",)
+))
+REGISTRY.register(Gauge(
+    "early_bird_data_version", "Current data version",
+    lambda: {(): sensor.data_version} if sensor else {}
+))
+REGISTRY.register(CallbackCounter(
+    "early_bird_summary_cache_requests_total", "Summary cache lookups by result",
+    collect_cache_lookups, labels=("result",)
+))
+REGISTRY.register(Gauge(
+    "early_bird_startup_seconds", "Seconds from process start to each startup phase",
+    lambda: {(phase,): round(ms / 1000, 4) for phase, ms in startup["timings"].items()}, labels=("phase",)
+))
+REGISTRY.register(Gauge(
+    "early_bird_stream_clients", "Open change streams",
+    lambda: {(): broadcaster.client_count} if broadcaster else {}
+))
+
+@app.before_request
+def start_timer():
+    """Remember when the request started (runs before the other hooks)"""
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    """Count the request and observe its duration and response size"""
+    if 'request_start' in g:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUESTS.inc(method=request.method, endpoint=endpoint, status=str(response.status_code))
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - g.request_start, method=request.method, endpoint=endpoint
+        )
+        if response.content_length is not None:
+            HTTP_RESPONSE_BYTES.observe(response.content_length, endpoint=endpoint)
+    return response
+
+# Startup readiness
+
+# Seconds a request waits for the data before it is answered with 503
+STARTUP_WAIT_SECONDS = 5
+
+# Paths answered while the data is still loading
+STARTUP_EXEMPT_PATHS = {'/health', '/metrics'}
+
+@app.before_request
+def wait_for_startup():
+    """Hold requests until the data is loaded, or answer 503 if that takes too long"""
+    if request.path in STARTUP_EXEMPT_PATHS or request.endpoint == 'static':
+        return None
+    if ready.wait(STARTUP_WAIT_SECONDS) and startup["state"] == "ready":
+        return None
+
+    if startup["state"] == "error":
+        response = jsonify({"error": "Data could not be loaded", "detail": startup["error"]})
+        response.status_code = 500
+        return response
+    if request.path.startswith('/api/'):
+        response = jsonify({"error": "Starting up, data is still loading"})
+    else:
+        response = app.response_class(
+            '<meta http-equiv="refresh" content="5">Early Bird is starting…', mimetype='text/html'
+        )
+    response.status_code = 503
+    response.headers['Retry-After'] = '5'
+    return response
+
+# Request profiling
+
+profiler = RequestProfiler(os.path.join(DATA_DIR, 'profiles'))
+
+# Address of the Home Assistant ingress proxy; the ingress panel is admin-only
+INGRESS_ADDRESSES = {'172.30.32.2', '127.0.0.1'}
+
+# Long-lived or diagnostic responses that are never profiled
+PROFILE_EXCLUDED_PATHS = {'/api/stream', '/metrics'}
+
+def is_admin_request():
+    """Whether the request came through the ingress panel or from inside the container"""
+    return request.remote_addr in INGRESS_ADDRESSES
+
+@app.before_request
+def start_profile():
+    """Profile the request if enabled in the options or requested with ?__profile=1"""
+    if request.path in PROFILE_EXCLUDED_PATHS or request.path.startswith('/api/debug/'):
+        return None
+    if config.get('profiling', False) or (request.args.get('__profile') == '1' and is_admin_request()):
+        # None if another request of this process is being profiled
+        g.profile = profiler.start()
+    return None
+
+@app.after_request
+def save_profile(response):
+    """Store the profile of the request and name it in the X-Profile-Id header"""
+    profile = g.pop('profile', None)
+    if profile:
+        duration_ms = (time.perf_counter() - g.request_start) * 1000
+        path = request.full_path if request.query_string else request.path
+        response.headers['X-Profile-Id'] = profiler.save(
+            profile, request.method, path, response.status_code, duration_ms
+        )
+    return response
+
+@app.teardown_request
+def stop_profile(exception):
+    """Stop the profile of a request that failed before it was saved"""
+    profile = g.pop('profile', None)
+    if profile:
+        profiler.stop(profile)
+
+# Conditional GET support
+
+@app.before_request
+def sync_workers():
+    """Apply records added by other worker processes before serving"""
+    if sensor:
+        sensor.refresh()
+
+# Responses that change on every request and must not be revalidated
+NO_ETAG_PATHS = {'/api/cache/stats', '/api/stream'}
+
+def compute_etag():
+    """ETag of the current request: endpoint, args, data version and corrected-age day"""
+    corrected_day = sensor.get_corrected_day()
+    key = f"{request.path}?{request.query_string.decode()}|{sensor.data_version}|{corrected_day}"
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+@app.before_request
+def check_not_modified():
+    """Answer unchanged API GETs with 304 before calling the sensor"""
+    if (not sensor or request.method != 'GET' or not request.path.startswith('/api/')
+            or request.path in NO_ETAG_PATHS or request.path.startswith('/api/debug/')):
+        return None
+
+    g.etag = compute_etag()
+    if request.if_none_match:
+        if request.if_none_match.contains(g.etag):
+            return not_modified_response()
+    elif request.if_modified_since and request.if_modified_since > last_change():
+        # Last-Modified has whole seconds; a date equal to it can predate a
+        # write later in the same second, so only a later date is trusted
+        return not_modified_response()
+    return None
+
+@app.after_request
+def add_validators(response):
+    """Add ETag and Last-Modified to successful API GET responses"""
+    if 'etag' in g and response.status_code == 200:
+        response.set_etag(g.etag)
+        response.last_modified = last_modified()
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def last_change():
+    """Last data change or start of the current day, whichever is later"""
+    start_of_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(sensor.last_modified, start_of_day).astimezone()
+
+def last_modified():
+    """Last-Modified header value in whole seconds"""
+    return last_change().replace(microsecond=0)
+
+def not_modified_response():
+    """Build an empty 304 response carrying the current validators"""
+    response = app.response_class(status=304)
+    response.set_etag(g.etag)
+    response.last_modified = last_modified()
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/')
 def index():
@@ -59,28 +362,40 @@ def api_summary():
     """Get complete summary"""
     if not sensor:
         return jsonify({"error": "Sensor not configured"}), 400
-    return jsonify(sensor.get_summary())
+    return jsonify(sensor.get_summary(context=request_context()))
+
+@app.route('/api/dashboard')
+def api_dashboard():
+    """Get all dashboard sections in one response"""
+    if not sensor:
+        return jsonify({"error": "Sensor not configured"}), 400
+    sections = request.args.get('sections')
+    sections = [s.strip() for s in sections.split(',') if s.strip()] if sections else None
+    try:
+        return jsonify(sensor.get_dashboard(sections, context=request_context()))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 @app.route('/api/encouragement')
 def api_encouragement():
     """Get daily encouragement"""
     if not sensor:
         return jsonify({"error": "Sensor not configured"}), 400
-    return jsonify(sensor.get_daily_encouragement())
+    return jsonify(sensor.get_daily_encouragement(context=request_context()))
 
 @app.route('/api/age')
 def api_age():
     """Get corrected and actual age"""
     if not sensor:
         return jsonify({"error": "Sensor not configured"}), 400
-    return jsonify(sensor.calculate_corrected_age())
+    return jsonify(sensor.calculate_corrected_age(context=request_context()))
 
 @app.route('/api/wonder-weeks')
 def api_wonder_weeks():
     """Get Wonder Weeks information"""
     if not sensor:
         return jsonify({"error": "Sensor not configured"}), 400
-    return jsonify(sensor.get_current_wonder_week())
+    return jsonify(sensor.get_current_wonder_week(context=request_context()))
 
 @app.route('/api/milestones')
 def api_milestones():
@@ -89,7 +404,7 @@ def api_milestones():
         return jsonify({"error": "Sensor not configured"}), 400
     category = request.args.get('category')
     weeks_ahead = int(request.args.get('weeks_ahead', 12))
-    return jsonify(sensor.get_upcoming_milestones(category, weeks_ahead))
+    return jsonify(sensor.get_upcoming_milestones(category, weeks_ahead, context=request_context()))
 
 @app.route('/api/growth', methods=['GET', 'POST'])
 def api_growth():
@@ -105,6 +420,14 @@ def api_growth():
             head_circumference_cm=data.get('head_circumference_cm')
         )
         return jsonify(record)
+    elif 'limit' in request.args or 'cursor' in request.args:
+        try:
+            return jsonify(sensor.get_growth_history_page(
+                limit=int(request.args.get('limit', 50)),
+                cursor=request.args.get('cursor')
+            ))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
     else:
         return jsonify(sensor.get_growth_history())
 
@@ -121,6 +444,14 @@ def api_milestone_achievements():
             milestone_description=data.get('milestone')
         )
         return jsonify(achievement)
+    elif 'limit' in request.args or 'cursor' in request.args:
+        try:
+            return jsonify(sensor.get_milestone_history_page(
+                limit=int(request.args.get('limit', 50)),
+                cursor=request.args.get('cursor')
+            ))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
     else:
         return jsonify(sensor.get_milestone_history())
 
@@ -129,7 +460,7 @@ def api_u_examinations():
     """Get U-examinations status"""
     if not sensor:
         return jsonify({"error": "Sensor not configured"}), 400
-    return jsonify(sensor.get_u_examinations_status())
+    return jsonify(sensor.get_u_examinations_status(context=request_context()))
 
 @app.route('/api/u-examinations/complete', methods=['POST'])
 def api_complete_u_examination():
@@ -172,7 +503,22 @@ def api_sleep_summary():
     date = request.args.get('date')
     days_back = int(request.args.get('days_back', 7))
 
-    return jsonify(sensor.get_sleep_summary(date, days_back))
+    return jsonify(sensor.get_sleep_summary(date, days_back, context=request_context()))
+
+@app.route('/api/sleep/series')
+def api_sleep_series():
+    """Get sleep statistics per day, week or month"""
+    if not sensor:
+        return jsonify({"error": "Sensor not configured"}), 400
+
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    bucket = request.args.get('bucket', 'day')
+
+    try:
+        return jsonify(sensor.get_sleep_series(date_from, date_to, bucket))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 @app.route('/api/sleep/records')
 def api_sleep_records():
@@ -192,7 +538,7 @@ def api_progress_reminder():
         return jsonify({"error": "Sensor not configured"}), 400
 
     weeks_back = int(request.args.get('weeks_back', 4))
-    return jsonify(sensor.get_progress_reminder(weeks_back))
+    return jsonify(sensor.get_progress_reminder(weeks_back, context=request_context()))
 
 # Growth Chart Endpoints
 
@@ -222,8 +568,17 @@ def api_pride_archive():
 
     filter_category = request.args.get('category')
     sort_order = request.args.get('sort', 'desc')
-
-    return jsonify(sensor.get_pride_archive(filter_category, sort_order))
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+
+    try:
+        return jsonify(sensor.get_pride_archive(
+            filter_category, sort_order,
+            limit=int(limit) if limit else None,
+            cursor=cursor
+        ))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 @app.route('/api/pride-archive/monthly/<year_month>')
 def api_monthly_summary(year_month):
@@ -252,10 +607,150 @@ def archive_page():
         return render_template('setup.html', ingress_path=get_ingress_path())
     return render_template('archive.html', config=config, ingress_path=get_ingress_path())
 
+@app.route('/api/changes')
+def api_changes():
+    """Get records added after a sequence number"""
+    if not sensor:
+        return jsonify({"error": "Sensor not configured"}), 400
+    try:
+        since = int(request.args.get('since', 0))
+        limit = request.args.get('limit')
+        limit = int(limit) if limit is not None else None
+        return jsonify(sensor.get_changes(since, limit))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/export')
+def api_export():
+    """Stream stored records as NDJSON or CSV"""
+    if not sensor:
+        return jsonify({"error": "Sensor not configured"}), 400
+    fmt = request.args.get('format', 'ndjson')
+    sections = request.args.get('sections')
+    sections = [s.strip() for s in sections.split(',') if s.strip()] if sections else None
+    try:
+        chunks = sensor.export_records(sections, fmt)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    filename = f"early_bird_export_{datetime.now().strftime('%Y%m%d')}.{fmt}"
+    return Response(
+        chunks,
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+@app.route('/api/import', methods=['POST'])
+def api_import():
+    """Import records from an NDJSON or CSV upload"""
+    if not sensor:
+        return jsonify({"error": "Sensor not configured"}), 400
+
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    fmt = request.args.get('format')
+    if not fmt:
+        fmt = 'csv' if upload and upload.filename.lower().endswith('.csv') else 'ndjson'
+
+    lines = codecs.iterdecode(stream, 'utf-8-sig')
+    try:
+        return jsonify(sensor.import_records(lines, fmt, request.args.get('section')))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/stream')
+def api_stream():
+    """Server-Sent Events stream of data changes and day rollovers"""
+    if not sensor:
+        return jsonify({"error": "Sensor not configured"}), 400
+    if broadcaster.is_full:
+        response = jsonify({"error": "Too many open streams"})
+        response.headers['Retry-After'] = '60'
+        return response, 503
+
+    return Response(
+        broadcaster.stream(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/cache/stats')
+def api_cache_stats():
+    """Get summary cache hit/miss counters"""
+    if not sensor:
+        return jsonify({"error": "Sensor not configured"}), 400
+    return jsonify(sensor.get_cache_stats())
+
+@app.route('/api/debug/profiles')
+def api_debug_profiles():
+    """List the most recent request profiles"""
+    if not is_admin_request():
+        return jsonify({"error": "Profiles are only available through the Home Assistant panel"}), 403
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({
+        "profiling": config.get('profiling', False),
+        "profiles": profiler.recent(limit)
+    })
+
+@app.route('/api/debug/profiles/<name>')
+def api_debug_profile_file(name):
+    """Download a stored .prof file or text report"""
+    if not is_admin_request():
+        return jsonify({"error": "Profiles are only available through the Home Assistant panel"}), 403
+    if not name.endswith(('.prof', '.txt')):
+        return jsonify({"error": "Unknown profile file"}), 404
+    return send_from_directory(profiler.directory, name, as_attachment=name.endswith('.prof'))
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics of this worker process"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/health')
 def health():
-    """Health check endpoint"""
-    return jsonify({"status": "healthy"})
+    """Health check endpoint: "starting" while the data loads, then "ready" """
+    status = {"status": startup["state"], "startup_ms": startup["timings"]}
+    if startup["state"] == "error":
+        return jsonify({**status, "error": startup["error"]}), 500
+    return jsonify(status)
+
+def serve():
+    """Serve the app with the server selected in the options"""
+    if config.get('server', 'production') == 'development':
+        start_loading()
+        app.run(host='0.0.0.0', port=8099, debug=False, threaded=True)
+        return
+
+    import logging
+    from waitress import create_server
+
+    listen = {'host': '0.0.0.0', 'port': 8099}
+    if workers > 1:
+        # All workers accept connections from one listening socket
+        listener = socket.create_server(('0.0.0.0', 8099), backlog=config.get('server_backlog', 64))
+        listen = {'sockets': [listener]}
+        for _ in range(workers - 1):
+            pid = os.fork()
+            if pid == 0:
+                worker_pids.clear()
+                break
+            worker_pids.append(pid)
+
+    # Each worker loads its own sensor and storage handles after the fork
+    start_loading()
+    logging.basicConfig()
+    server = create_server(
+        app,
+        **listen,
+        threads=config.get('server_threads', 8),
+        connection_limit=config.get('server_connection_limit', 100),
+        backlog=config.get('server_backlog', 64),
+        channel_timeout=config.get('server_keepalive_timeout', 120),
+        ident='Early Bird'
+    )
+    mark_startup("listening")
+    server.print_listen("Serving on http://{}:{}")
+    server.run()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8099, debug=False)
+    serve()
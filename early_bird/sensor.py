@@ -2,10 +2,242 @@
 Early Bird Sensor - Tracks development of premature children
 Includes corrected age calculation, milestone tracking, and Wonder Weeks integration
 """
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
+import base64
 import json
-import os
+import threading
+from exchange import EXPORT_FIELDS, EXPORT_FORMATS, IMPORT_FIELDS, export_records, parse_row, read_rows
+from indexes import ChangeFeed, SleepIndex, SleepRollups, Timeline
+from metrics import SENSOR_CALL_SECONDS, instrument_methods
+from storage import create_storage
+
+
+def encode_cursor(values):
+    """Encode pagination position values as an opaque cursor string"""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode an opaque cursor string
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def round_centihours(centihours):
+    """
+    Convert an exact total in hundredths of an hour to hours with one decimal
+
+    Halves are rounded up, as on paper; rounding the float hours would round
+    some of them down (44.25 -> 44.2).
+    """
+    return (centihours + 5) // 10 / 10
+
+
+class EvaluationContext:
+    """
+    Per-request evaluation context
+
+    Captures "now" once and computes the derived age values on first use, so
+    every part of a response is based on the same moment.
+    """
+
+    def __init__(self, sensor, now=None):
+        """
+        Args:
+            sensor: EarlyBirdSensor the values are derived for
+            now: Reference time, defaults to datetime.now()
+        """
+        self.sensor = sensor
+        self.now = now or datetime.now()
+        self._age_info = None
+        self._wonder_week = None
+
+    @property
+    def age_info(self):
+        """Corrected age, actual age and prematurity (computed once)"""
+        if self._age_info is None:
+            self._age_info = self.sensor._compute_corrected_age(self.now)
+        return self._age_info
+
+    @property
+    def corrected_day(self):
+        """Days since the due date; age-derived values change only with it"""
+        return (self.now - self.sensor.due_date).days
+
+    @property
+    def corrected_weeks(self):
+        """Completed weeks since the due date"""
+        return self.age_info["corrected_age"]["total_weeks"]
+
+    @property
+    def wonder_week(self):
+        """Current/next Wonder Week (computed once)"""
+        if self._wonder_week is None:
+            self._wonder_week = self.sensor._compute_wonder_week(self.corrected_weeks)
+        return self._wonder_week
+
+
+class SummaryCache:
+    """
+    Cache for age-derived results keyed by corrected-age day and data version
+
+    Keys end with (corrected_day, data_version). Storing a key drops entries
+    of earlier days or versions, and at most max_entries are kept, evicting
+    the least recently used.
+    """
+
+    # Entries kept at most (results for different arguments of the same day)
+    MAX_ENTRIES = 256
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key, compute):
+        """
+        Get a cached value or compute and store it
+
+        Args:
+            key: Hashable cache key ending with (corrected_day, data_version)
+            compute: Callable producing the value on a miss
+
+        Returns:
+            Cached or freshly computed value
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = compute()
+        with self._lock:
+            self.misses += 1
+            day, version = key[-2:]
+            stale = [k for k in self._entries if k[-2] < day or k[-1] < version]
+            for k in stale:
+                del self._entries[k]
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self):
+        """Drop all cached values"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        """Get hit/miss counters"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries)
+            }
+
+
+class DataSnapshot:
+    """
+    One published version of the data and its indexes, never modified afterwards
+
+    Indexes are built on first use, so sections no request needs are never
+    loaded from the data file.
+    """
+
+    def __init__(self, data, version, build, seq_head=None, **indexes):
+        """
+        Initialize the snapshot
+
+        Args:
+            data: Data of this version
+            version: Data version
+            build: Callable (name, data) building a missing index
+            seq_head: Highest sequence number if known from the previous snapshot
+            **indexes: Indexes derived from the previous snapshot
+        """
+        self.data = data
+        self.version = version
+        self._seq_head = seq_head
+        self.last_modified = datetime.now()
+        self._build = build
+        self._indexes = indexes
+        self._lock = threading.Lock()
+
+    def index(self, name):
+        """Get an index, building it on first use"""
+        index = self._indexes.get(name)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(name)
+                if index is None:
+                    index = self._indexes[name] = self._build(name, self.data)
+        return index
+
+    def built_indexes(self):
+        """Get the indexes built so far by name"""
+        with self._lock:
+            return dict(self._indexes)
+
+    @property
+    def sleep_index(self):
+        """Sleep records ordered by start time"""
+        return self.index("sleep_index")
+
+    @property
+    def sleep_rollups(self):
+        """Per-day sleep aggregates"""
+        return self.index("sleep_rollups")
+
+    @property
+    def timeline(self):
+        """Pride archive timeline"""
+        # Events are keyed by sequence number; records of old versions get theirs first
+        self.seq_head
+        return self.index("timeline")
+
+    @property
+    def changes(self):
+        """Change feed ordered by sequence number"""
+        return self.index("changes")
+
+    @property
+    def seq_head(self):
+        """
+        Highest sequence number, without building the change feed if possible
+
+        Only records without a sequence number (from old versions) need the
+        change feed, which numbers them.
+        """
+        head = self._seq_head
+        if head is None:
+            feed = self.built_indexes().get("changes")
+            head = feed.head if feed else self.data.seq_head()
+            if head is None:
+                head = self.changes.head
+            self._seq_head = head
+        return head
+
+    def known_seq_head(self):
+        """Get the highest sequence number if already known, otherwise None"""
+        return self._seq_head
 
 
 class EarlyBirdSensor:
@@ -211,7 +443,20 @@ class EarlyBirdSensor:
         }
     ]
 
-    def __init__(self, child_name, birth_date, due_date, data_file="data/child_data.json"):
+    # Per-line errors reported by an import (further errors are only counted)
+    MAX_IMPORT_ERRORS = 100
+
+    # Largest page of paginated histories; larger limits are capped
+    MAX_PAGE_SIZE = 500
+
+    # Buckets of one sleep series request (a little over a year of days)
+    MAX_SERIES_BUCKETS = 400
+
+    # Sections of the composite dashboard response
+    DASHBOARD_SECTIONS = ("age", "wonder_weeks", "milestones", "encouragement", "u_examinations")
+
+    def __init__(self, child_name, birth_date, due_date, data_file="data/child_data.json",
+                 storage_engine="json", flush_interval_ms=0):
         """
         Initialize the Early Bird sensor
         
@@ -220,37 +465,446 @@ class EarlyBirdSensor:
             birth_date: Actual birth date (YYYY-MM-DD)
             due_date: Expected due date (YYYY-MM-DD)
             data_file: Path to data storage file
+            storage_engine: "json" (default) or "sqlite"
+            flush_interval_ms: Write-behind interval in ms (0 = save immediately)
         """
         self.child_name = child_name
         self.birth_date = datetime.strptime(birth_date, "%Y-%m-%d")
         self.due_date = datetime.strptime(due_date, "%Y-%m-%d")
         self.data_file = data_file
-        self.data = self._load_data()
+        self.storage = create_storage(storage_engine, data_file, flush_interval_ms)
+        self._cache = SummaryCache()
+        self._change_listeners = []
+        # Serializes writers; readers use the current snapshot without locking
+        self._lock = threading.RLock()
+        self._snapshot = self._build_snapshot(self._load_data())
+        if self.storage.upgrade_pending:
+            # Number records of old files before rewriting them in the current layout
+            self._snapshot.index("changes")
+            self.storage.compact()
+
+    @property
+    def data(self):
+        """Current data; treat as read-only, writers publish a new snapshot"""
+        return self._snapshot.data
+
+    @property
+    def data_version(self):
+        """Version of the current data"""
+        return self._snapshot.version
+
+    @property
+    def last_modified(self):
+        """Time the current data was published"""
+        return self._snapshot.last_modified
     
     def _load_data(self):
-        """Load stored data from file"""
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                return json.load(f)
-        return {
+        """Load stored data from the storage backend"""
+        return self.storage.load({
             "growth_records": [],
             "milestone_achievements": []
-        }
+        })
     
     def _save_data(self):
-        """Save data to file"""
-        os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-        with open(self.data_file, 'w') as f:
-            json.dump(self.data, f, indent=2)
+        """Save a full snapshot of the data to file"""
+        self.storage.save(self.data)
+
+    def close(self):
+        """Write any pending changes to storage"""
+        self.storage.close()
+
+    def _commit(self, op, section, value):
+        """
+        Apply a mutation and append it to the journal
+
+        Args:
+            op: "append" to add a record, "add" to add a unique value
+            section: Data section to modify (e.g. "sleep_records")
+            value: Record or value to add
+        """
+        self._commit_many([(op, section, value)])
+
+    def _commit_many(self, mutations):
+        """
+        Apply a batch of mutations and persist them with one write
+
+        The mutations are applied to copies of the affected sections and
+        indexes, which are then published as a new snapshot in one step.
+
+        Args:
+            mutations: List of (op, section, value) tuples
+        """
+        with self._lock, self.storage.process_lock():
+            # Sequence numbers continue after records of other workers
+            sections = self._sync()
+            snapshot = self._snapshot
+            entries = []
+            seq = snapshot.seq_head
+            for op, section, value in mutations:
+                if isinstance(value, dict):
+                    seq += 1
+                    value["seq"] = seq
+                entries.append({"op": op, "section": section, "value": value})
+
+            data = snapshot.data.copy()
+            for section in {entry["section"] for entry in entries}:
+                data[section] = list(data.get(section, []))
+            applied = self.storage.commit_many(data, entries)
+            if applied:
+                self._publish(self._next_snapshot(snapshot, data, applied))
+                sections += [entry["section"] for entry in applied]
+        self._notify(sections)
+
+    def refresh(self):
+        """Pick up records written by other worker processes"""
+        if not self.storage.stale():
+            return
+        with self._lock:
+            sections = self._sync()
+        self._notify(sections)
+
+    def _sync(self):
+        """
+        Apply changes of other processes (caller holds the lock)
+
+        Returns:
+            list: Changed sections
+        """
+        if not self.storage.stale():
+            return []
+        snapshot = self._snapshot
+        data = snapshot.data.copy()
+        for section in data:
+            if data.is_loaded(section) and isinstance(data[section], list):
+                data[section] = list(data[section])
+        data, entries = self.storage.sync(data)
+        if entries is None:
+            self._publish(self._build_snapshot(data))
+            return list(data.record_counts())
+        if entries:
+            self._publish(self._next_snapshot(snapshot, data, entries))
+        return [entry["section"] for entry in entries]
+
+    def _publish(self, snapshot):
+        """Swap in a new snapshot (caller holds the lock)"""
+        self._snapshot = snapshot
+        self._cache.invalidate()
+
+    def _notify(self, sections):
+        """Call change listeners once per changed section"""
+        data_version = self.data_version
+        for section in dict.fromkeys(sections):
+            for listener in self._change_listeners:
+                listener(section, data_version)
+
+    def add_change_listener(self, listener):
+        """
+        Register a callback invoked after every data change
+
+        Args:
+            listener: Callable (section, data_version)
+        """
+        self._change_listeners.append(listener)
+
+    def get_changes(self, since=0, limit=None):
+        """
+        Get records added after a sequence number for delta sync
+
+        Args:
+            since: Last sequence number the client has seen (0 for all)
+            limit: Optional maximum number of changes
+
+        Returns:
+            dict: Head sequence number, changes in sequence order and
+                whether more changes follow
+        """
+        if since < 0:
+            raise ValueError("since must not be negative")
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be positive")
+
+        feed = self._snapshot.changes
+        changes = feed.since(since, limit)
+        head = feed.head
+        return {
+            "since": since,
+            "head": head,
+            "changes": changes,
+            "has_more": bool(changes) and changes[-1]["seq"] < head
+        }
+
+    def export_records(self, sections=None, fmt="ndjson"):
+        """
+        Stream stored records for export
+
+        Args:
+            sections: Optional list of sections (default: all exportable sections)
+            fmt: "ndjson" or "csv"
+
+        Returns:
+            generator: Chunks of the export document
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        sections = sections or list(EXPORT_FIELDS)
+        unknown = [s for s in sections if s not in EXPORT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown export section: {', '.join(unknown)}")
+        return export_records(self.data, sections, fmt)
+
+    def import_records(self, lines, fmt="ndjson", default_section=None):
+        """
+        Import records from an NDJSON or CSV document
+
+        Lines are parsed and validated one at a time; invalid lines are
+        reported and skipped, all valid records are persisted with one write.
+
+        Args:
+            lines: Iterable of text lines
+            fmt: "ndjson" or "csv"
+            default_section: Section for rows without a "section" field
+
+        Returns:
+            dict: Imported record counts per section, per-line errors and
+                the new head sequence number
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown import format: {fmt}")
+        if default_section and default_section not in IMPORT_FIELDS:
+            raise ValueError(f"Unknown import section: {default_section}")
+
+        now = datetime.now()
+        mutations = []
+        imported = dict.fromkeys(IMPORT_FIELDS, 0)
+        errors = []
+        error_count = 0
+        for line_no, row in read_rows(lines, fmt):
+            try:
+                if isinstance(row, ValueError):
+                    raise row
+                section, fields = parse_row(row, default_section)
+                mutations.extend(self._import_mutations(section, fields, now))
+                imported[section] += 1
+            except ValueError as e:
+                error_count += 1
+                if len(errors) < self.MAX_IMPORT_ERRORS:
+                    errors.append({"line": line_no, "error": str(e)})
+
+        self._commit_many(mutations)
+        return {
+            "imported": imported,
+            "error_count": error_count,
+            "errors": errors,
+            "head": self._snapshot.seq_head
+        }
+
+    def _import_mutations(self, section, fields, now):
+        """
+        Build the mutations for one imported row
+
+        Corrected age is evaluated at the date of the record, not at import time.
+
+        Args:
+            section: Target section
+            fields: Converted fields from parse_row
+            now: Time of the import
+
+        Returns:
+            list: (op, section, value) mutations
+
+        Raises:
+            ValueError: If a value is out of range
+        """
+        date = fields.get("date") or fields["start_time"]
+        if date > now:
+            raise ValueError("Date is in the future")
+        if date < self.birth_date:
+            raise ValueError("Date is before the birth date")
+        context = self.create_context(now=date)
+
+        if section == "growth_records":
+            record = self._growth_record(
+                context, fields["weight_kg"], fields["height_cm"], fields.get("head_circumference_cm")
+            )
+            return [("append", section, record)]
+
+        if section == "milestone_achievements":
+            if fields["category"] not in self.MILESTONES:
+                raise ValueError(f"Unknown category: {fields['category']}")
+            record = self._milestone_record(context, fields["category"], fields["milestone"], fields.get("notes", ""))
+            return [("append", section, record)]
+
+        if section == "sleep_records":
+            quality = fields.get("quality", "normal")
+            if fields["sleep_type"] not in ("night", "nap"):
+                raise ValueError(f"Invalid sleep_type: {fields['sleep_type']}")
+            if quality not in ("poor", "normal", "good"):
+                raise ValueError(f"Invalid quality: {quality}")
+            if fields["end_time"] <= fields["start_time"]:
+                raise ValueError("end_time must be after start_time")
+            record = self._sleep_record(
+                fields["sleep_type"], fields["start_time"].isoformat(), fields["end_time"].isoformat(),
+                quality, fields.get("notes", ""), context
+            )
+            return [("append", section, record)]
+
+        exam_name = fields["exam_name"]
+        if exam_name not in {exam["name"] for exam in self.U_EXAMINATIONS}:
+            raise ValueError(f"Unknown examination: {exam_name}")
+        record = {
+            "exam_name": exam_name,
+            "date": context.now.isoformat(),
+            "corrected_age_weeks": context.corrected_weeks,
+            "notes": fields.get("notes", "")
+        }
+        return [("add", "u_examinations_completed", exam_name), ("append", section, record)]
+
+    def get_corrected_day(self):
+        """Get the number of days since the due date"""
+        return (datetime.now() - self.due_date).days
+
+    def _cached(self, name, context, compute, *args):
+        """
+        Serve an age-derived result from the summary cache
+
+        Args:
+            name: Result name
+            context: EvaluationContext of the current request
+            compute: Callable (context, *args) computing the result on a miss
+            *args: Arguments that are part of the cache key
+        """
+        key = (name, args, context.corrected_day, self.data_version)
+        return self._cache.get(key, lambda: compute(context, *args))
+
+    def get_cache_stats(self):
+        """
+        Get summary cache statistics
+
+        Returns:
+            dict: Hits, misses, hit rate, invalidations and entry count
+        """
+        return {**self._cache.stats(), "data_version": self.data_version}
+
+    def _build_snapshot(self, data):
+        """Build a snapshot over loaded data, its indexes are built on first use"""
+        # Rollups are part of the persisted data and kept current from the start;
+        # only records not counted yet (usually replayed from the journal) are read
+        sleep_rollups = SleepRollups(data.setdefault("sleep_daily_rollups", {}))
+        for record in data.records_from("sleep_records", sleep_rollups.state["records"]):
+            sleep_rollups.add(record)
+        return DataSnapshot(
+            data,
+            # Sections are append-only, so the record count is a version that
+            # only grows and is the same again after a restart
+            sum(data.record_counts().values()),
+            self._build_index,
+            sleep_rollups=sleep_rollups
+        )
+
+    def _build_index(self, name, data):
+        """
+        Build an index over the data of a snapshot
+
+        Args:
+            name: "sleep_index", "timeline" or "changes"
+            data: Snapshot data
+
+        Returns:
+            Index instance
+        """
+        if name == "sleep_index":
+            return SleepIndex(data.get("sleep_records", []))
+        if name == "timeline":
+            return Timeline(self._format_event, data)
+        return ChangeFeed(data)
+
+    def _next_snapshot(self, snapshot, data, entries):
+        """
+        Derive the snapshot following committed entries
+
+        Indexes of untouched sections are shared with the previous snapshot,
+        the others are copied before the new records are added. Indexes the
+        previous snapshot has not built yet are left to be built on first use.
+
+        Args:
+            snapshot: Current snapshot
+            data: New data with the entries applied
+            entries: Applied entries
+
+        Returns:
+            DataSnapshot: Next snapshot
+        """
+        sections = {entry["section"] for entry in entries}
+        indexes = snapshot.built_indexes()
+        copied = {"changes"}
+        if "sleep_records" in sections:
+            copied |= {"sleep_index", "sleep_rollups"}
+        if sections & set(Timeline.SOURCES):
+            copied.add("timeline")
+        for name in copied & set(indexes):
+            indexes[name] = indexes[name].copy()
+        if "sleep_records" in sections:
+            data["sleep_daily_rollups"] = indexes["sleep_rollups"].state
+
+        for entry in entries:
+            section, value = entry["section"], entry["value"]
+            if section == "sleep_records":
+                indexes["sleep_rollups"].add(value)
+                if "sleep_index" in indexes:
+                    indexes["sleep_index"].add(value)
+            elif section in Timeline.SOURCES and "timeline" in indexes:
+                indexes["timeline"].add(section, value)
+            if isinstance(value, dict) and "changes" in indexes:
+                indexes["changes"].add(section, value)
+
+        # The head moves on with the new records unless one is not numbered
+        seq_head = snapshot.known_seq_head()
+        values = [entry["value"] for entry in entries if isinstance(entry["value"], dict)]
+        if seq_head is not None and all("seq" in value for value in values):
+            seq_head = max([seq_head] + [value["seq"] for value in values])
+        else:
+            seq_head = None
+
+        return DataSnapshot(data, snapshot.version + len(entries), self._build_index, seq_head, **indexes)
+
+    def _records_since(self, section, since):
+        """Get records of a section dated at or after the given datetime"""
+        if self.storage.indexed:
+            return self.storage.records_since(section, since.isoformat())
+        return [
+            r for r in self.data.get(section, [])
+            if datetime.fromisoformat(r["date"]) >= since
+        ]
     
-    def calculate_corrected_age(self):
+    def create_context(self, now=None):
+        """
+        Create an evaluation context shared by all calls of one request
+
+        Args:
+            now: Optional reference time (defaults to now)
+
+        Returns:
+            EvaluationContext: Context to pass as ``context`` to sensor methods
+        """
+        return EvaluationContext(self, now)
+
+    def calculate_corrected_age(self, context=None):
         """
         Calculate corrected age based on due date
         
+        Args:
+            context: Optional EvaluationContext of the current request
+
         Returns:
             dict: Corrected age in years, months, weeks, and days
         """
-        today = datetime.now()
+        return (context or self.create_context()).age_info
+
+    def _compute_corrected_age(self, today):
+        """Compute corrected age values for a reference time"""
+        # Imported on first use, it is not needed to start the server
+        from dateutil.relativedelta import relativedelta
+
         age_from_due = relativedelta(today, self.due_date)
         
         # Calculate total weeks from due date
@@ -289,16 +943,21 @@ class EarlyBirdSensor:
             }
         }
     
-    def get_current_wonder_week(self):
+    def get_current_wonder_week(self, context=None):
         """
         Get current or next Wonder Week based on corrected age
         
+        Args:
+            context: Optional EvaluationContext of the current request
+
         Returns:
             dict: Current/next Wonder Week information
         """
-        age_info = self.calculate_corrected_age()
-        current_week = age_info["corrected_age"]["total_weeks"]
-        
+        context = context or self.create_context()
+        return self._cached("wonder_week", context, lambda ctx: ctx.wonder_week)
+
+    def _compute_wonder_week(self, current_week):
+        """Find current and next Wonder Week for a corrected age in weeks"""
         current_leap = None
         next_leap = None
         
@@ -318,19 +977,25 @@ class EarlyBirdSensor:
             "current_week": current_week
         }
     
-    def get_upcoming_milestones(self, category=None, weeks_ahead=12):
+    def get_upcoming_milestones(self, category=None, weeks_ahead=12, context=None):
         """
         Get upcoming milestones based on corrected age
         
         Args:
             category: Optional category filter (motor, cognitive, language)
             weeks_ahead: Number of weeks to look ahead
+            context: Optional EvaluationContext of the current request
             
         Returns:
             list: Upcoming milestones
         """
-        age_info = self.calculate_corrected_age()
-        current_week = age_info["corrected_age"]["total_weeks"]
+        context = context or self.create_context()
+        return self._cached("upcoming_milestones", context, self._compute_upcoming_milestones,
+                            category, weeks_ahead)
+
+    def _compute_upcoming_milestones(self, context, category, weeks_ahead):
+        """Find milestones due within the next weeks"""
+        current_week = context.corrected_weeks
         
         upcoming = []
         categories = [category] if category else ["motor", "cognitive", "language", "life_moments"]
@@ -356,18 +1021,21 @@ class EarlyBirdSensor:
             height_cm: Height in centimeters
             head_circumference_cm: Optional head circumference in cm
         """
-        age_info = self.calculate_corrected_age()
-        record = {
-            "date": datetime.now().isoformat(),
+        record = self._growth_record(self.create_context(), weight_kg, height_cm, head_circumference_cm)
+        self._commit("append", "growth_records", record)
+        return record
+
+    def _growth_record(self, context, weight_kg, height_cm, head_circumference_cm=None):
+        """Build a growth record dated at the context's time"""
+        age_info = context.age_info
+        return {
+            "date": context.now.isoformat(),
             "corrected_age_weeks": age_info["corrected_age"]["total_weeks"],
             "actual_age_weeks": age_info["actual_age"]["total_days"] // 7,
             "weight_kg": weight_kg,
             "height_cm": height_cm,
             "head_circumference_cm": head_circumference_cm
         }
-        self.data["growth_records"].append(record)
-        self._save_data()
-        return record
     
     def add_milestone_achievement(self, category, milestone_description, notes=""):
         """
@@ -381,12 +1049,17 @@ class EarlyBirdSensor:
         Returns:
             dict: Achievement record including congratulation message
         """
+        achievement = self._milestone_record(self.create_context(), category, milestone_description, notes)
+        self._commit("append", "milestone_achievements", achievement)
+        return achievement
+
+    def _milestone_record(self, context, category, milestone_description, notes=""):
+        """Build a milestone achievement dated at the context's time"""
         import random
 
-        age_info = self.calculate_corrected_age()
         achievement = {
-            "date": datetime.now().isoformat(),
-            "corrected_age_weeks": age_info["corrected_age"]["total_weeks"],
+            "date": context.now.isoformat(),
+            "corrected_age_weeks": context.age_info["corrected_age"]["total_weeks"],
             "category": category,
             "milestone": milestone_description,
             "notes": notes
@@ -398,9 +1071,6 @@ class EarlyBirdSensor:
             achievement["congratulation"] = random.choice(templates).format(
                 name=self.child_name
             )
-
-        self.data["milestone_achievements"].append(achievement)
-        self._save_data()
         return achievement
     
     def get_growth_history(self):
@@ -411,16 +1081,91 @@ class EarlyBirdSensor:
         """Get all milestone achievements"""
         return self.data.get("milestone_achievements", [])
     
-    def get_summary(self):
+    def get_growth_history_page(self, limit=50, cursor=None):
+        """
+        Get growth records page by page in stored order
+
+        Args:
+            limit: Maximum number of records
+            cursor: Cursor from the previous page or None for the first page
+
+        Returns:
+            dict: Records and next_cursor (None on the last page)
+        """
+        return self._get_records_page("growth_records", limit, cursor)
+
+    def get_milestone_history_page(self, limit=50, cursor=None):
+        """
+        Get milestone achievements page by page in stored order
+
+        Args:
+            limit: Maximum number of records
+            cursor: Cursor from the previous page or None for the first page
+
+        Returns:
+            dict: Records and next_cursor (None on the last page)
+        """
+        return self._get_records_page("milestone_achievements", limit, cursor)
+
+    def _page_size(self, limit):
+        """
+        Validate a page size and cap it at MAX_PAGE_SIZE
+
+        Raises:
+            ValueError: If the limit is not positive
+        """
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        return min(limit, self.MAX_PAGE_SIZE)
+
+    def _get_records_page(self, section, limit, cursor):
+        """Slice an append-only section after the position encoded in the cursor"""
+        limit = self._page_size(limit)
+        records = self.data.get(section, [])
+        start = 0
+        if cursor:
+            position = decode_cursor(cursor)
+            try:
+                date, index = position["d"], position["s"]
+                valid = 0 <= index < len(records) and records[index]["date"] == date
+            except (KeyError, TypeError):
+                valid = False
+            if not valid:
+                raise ValueError("Invalid cursor")
+            start = index + 1
+
+        page = records[start:start + limit]
+        next_cursor = None
+        if page and start + limit < len(records):
+            last = start + len(page) - 1
+            next_cursor = encode_cursor({"d": records[last]["date"], "s": last})
+
+        return {
+            "records": page,
+            "next_cursor": next_cursor
+        }
+
+    def get_summary(self, context=None):
         """
         Get comprehensive summary of child's development
 
+        Args:
+            context: Optional EvaluationContext of the current request
+
         Returns:
             dict: Complete summary
         """
-        age_info = self.calculate_corrected_age()
-        wonder_week = self.get_current_wonder_week()
-        milestones = self.get_upcoming_milestones()
+        context = context or self.create_context()
+        summary = dict(self._cached("summary", context, self._compute_summary))
+        # Picked at random and dated per request, so never cached
+        summary["daily_encouragement"] = self.get_daily_encouragement(context)
+        return summary
+
+    def _compute_summary(self, context):
+        """Build the cacheable part of the development summary"""
+        age_info = context.age_info
+        wonder_week = context.wonder_week
+        milestones = self.get_upcoming_milestones(context=context)
 
         return {
             "child_name": self.child_name,
@@ -428,23 +1173,52 @@ class EarlyBirdSensor:
             "wonder_week": wonder_week,
             "upcoming_milestones": milestones,
             "growth_records_count": len(self.data.get("growth_records", [])),
-            "milestone_achievements_count": len(self.data.get("milestone_achievements", [])),
-            "daily_encouragement": self.get_daily_encouragement()
+            "milestone_achievements_count": len(self.data.get("milestone_achievements", []))
+        }
+
+    def get_dashboard(self, sections=None, context=None):
+        """
+        Get everything the dashboard shows, evaluated against one context
+
+        Args:
+            sections: Optional list of DASHBOARD_SECTIONS to include (default: all)
+            context: Optional EvaluationContext of the current request
+
+        Returns:
+            dict: One entry per requested section
+        """
+        context = context or self.create_context()
+        sections = sections or self.DASHBOARD_SECTIONS
+        unknown = [s for s in sections if s not in self.DASHBOARD_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown dashboard section: {', '.join(unknown)}")
+
+        builders = {
+            "age": lambda: context.age_info,
+            "wonder_weeks": lambda: self.get_current_wonder_week(context),
+            "milestones": lambda: self.get_upcoming_milestones(context=context),
+            "encouragement": lambda: self.get_daily_encouragement(context),
+            "u_examinations": lambda: self.get_u_examinations_status(context)
         }
+        return {section: builders[section]() for section in sections}
 
-    def get_daily_encouragement(self):
+    def get_daily_encouragement(self, context=None):
         """
         Get contextual encouragement based on current situation
 
+        Args:
+            context: Optional EvaluationContext of the current request
+
         Returns:
             dict: Encouragement message with context
         """
         import random
 
+        evaluation = context or self.create_context()
         context = "general"
 
         # Check Wonder Week status
-        current_ww = self.get_current_wonder_week()
+        current_ww = evaluation.wonder_week
         if current_ww and current_ww.get("current_leap"):
             context = "wonder_week_active"
         elif current_ww and current_ww.get("next_leap"):
@@ -455,13 +1229,13 @@ class EarlyBirdSensor:
         # Check recent milestone achievements (last 7 days)
         recent_achievements = [
             a for a in self.data.get("milestone_achievements", [])
-            if (datetime.now() - datetime.fromisoformat(a["date"])).days <= 7
+            if (evaluation.now - datetime.fromisoformat(a["date"])).days <= 7
         ]
         if recent_achievements:
             context = "milestone_achieved"
 
         # Check upcoming milestones (next 2 weeks)
-        upcoming = self.get_upcoming_milestones(weeks_ahead=2)
+        upcoming = self.get_upcoming_milestones(weeks_ahead=2, context=evaluation)
         if upcoming and context not in ["milestone_achieved", "wonder_week_active"]:
             context = "milestone_upcoming"
 
@@ -477,17 +1251,25 @@ class EarlyBirdSensor:
         return {
             "message": message,
             "context": context,
-            "date": datetime.now().isoformat()
+            "date": evaluation.now.isoformat()
         }
 
-    def get_u_examinations_status(self):
+    def get_u_examinations_status(self, context=None):
         """
         Get status of all U-examinations based on corrected age
 
+        Args:
+            context: Optional EvaluationContext of the current request
+
         Returns:
             dict: Past, current, upcoming, and completed U-examinations
         """
-        corrected_weeks = self._calculate_weeks_from_due()
+        context = context or self.create_context()
+        return self._cached("u_examinations", context, self._compute_u_examinations_status)
+
+    def _compute_u_examinations_status(self, context):
+        """Classify U-examinations by corrected age"""
+        corrected_weeks = self._calculate_weeks_from_due(context)
         completed_exams = self.data.get("u_examinations_completed", [])
 
         past = []
@@ -536,33 +1318,25 @@ class EarlyBirdSensor:
         Returns:
             dict: Updated examination record
         """
-        if "u_examinations_completed" not in self.data:
-            self.data["u_examinations_completed"] = []
-
-        if "u_examinations_records" not in self.data:
-            self.data["u_examinations_records"] = []
-
-        # Don't add duplicates
-        if exam_name not in self.data["u_examinations_completed"]:
-            self.data["u_examinations_completed"].append(exam_name)
-
+        context = self.create_context()
         record = {
             "exam_name": exam_name,
-            "date": date or datetime.now().isoformat(),
-            "corrected_age_weeks": self._calculate_weeks_from_due(),
+            "date": date or context.now.isoformat(),
+            "corrected_age_weeks": context.corrected_weeks,
             "notes": notes
         }
 
-        self.data["u_examinations_records"].append(record)
-        self._save_data()
+        # Both are saved with one write; "add" ignores duplicates
+        self._commit_many([
+            ("add", "u_examinations_completed", exam_name),
+            ("append", "u_examinations_records", record)
+        ])
 
         return record
 
-    def _calculate_weeks_from_due(self):
+    def _calculate_weeks_from_due(self, context=None):
         """Helper method to calculate weeks from due date"""
-        today = datetime.now()
-        total_days = (today - self.due_date).days
-        return total_days // 7
+        return (context or self.create_context()).corrected_weeks
 
     # Sleep Pattern Tracking Methods
 
@@ -580,14 +1354,18 @@ class EarlyBirdSensor:
         Returns:
             dict: Sleep record with duration calculated
         """
-        if "sleep_records" not in self.data:
-            self.data["sleep_records"] = []
+        record = self._sleep_record(sleep_type, start_time, end_time, quality, notes)
+        self._commit("append", "sleep_records", record)
 
+        return record
+
+    def _sleep_record(self, sleep_type, start_time, end_time, quality="normal", notes="", context=None):
+        """Build a sleep record with duration calculated"""
         start = datetime.fromisoformat(start_time)
         end = datetime.fromisoformat(end_time)
         duration_hours = (end - start).total_seconds() / 3600
 
-        record = {
+        return {
             "sleep_type": sleep_type,
             "start_time": start_time,
             "end_time": end_time,
@@ -595,49 +1373,37 @@ class EarlyBirdSensor:
             "quality": quality,
             "notes": notes,
             "date": start.date().isoformat(),
-            "corrected_age_weeks": self._calculate_weeks_from_due()
+            "corrected_age_weeks": self._calculate_weeks_from_due(context)
         }
 
-        self.data["sleep_records"].append(record)
-        self._save_data()
-
-        return record
-
-    def get_sleep_summary(self, date=None, days_back=7):
+    def get_sleep_summary(self, date=None, days_back=7, context=None):
         """
         Get sleep summary for date range
 
         Args:
             date: Target date (ISO format) or None for today
             days_back: Number of days to include
+            context: Optional EvaluationContext of the current request
 
         Returns:
             dict: Sleep statistics and patterns
         """
+        context = context or self.create_context()
         if not date:
-            date = datetime.now().date().isoformat()
+            date = context.now.date().isoformat()
 
         target_date = datetime.fromisoformat(date).date()
         start_date = target_date - timedelta(days=days_back)
 
-        records = self.data.get("sleep_records", [])
-
-        # Filter records in range
-        relevant_records = [
-            r for r in records
-            if start_date <= datetime.fromisoformat(r["date"]).date() <= target_date
-        ]
+        stats = self._get_sleep_stats(start_date, target_date)
 
-        if not relevant_records:
+        if not stats["count"]:
             return {"no_data": True}
 
         # Calculate statistics
-        total_sleep_hours = sum(r["duration_hours"] for r in relevant_records)
-        night_sleep = [r for r in relevant_records if r["sleep_type"] == "night"]
-        naps = [r for r in relevant_records if r["sleep_type"] == "nap"]
-
-        avg_night_sleep = sum(r["duration_hours"] for r in night_sleep) / len(night_sleep) if night_sleep else 0
-        avg_naps_per_day = len(naps) / days_back
+        total_sleep_hours = stats["total_centihours"] / 100
+        avg_night_sleep = stats["night_centihours"] / 100 / stats["nights"] if stats["nights"] else 0
+        avg_naps_per_day = stats["naps"] / days_back
         avg_total_sleep = total_sleep_hours / days_back
 
         return {
@@ -645,14 +1411,100 @@ class EarlyBirdSensor:
                 "start": start_date.isoformat(),
                 "end": target_date.isoformat()
             },
-            "total_sleep_hours": round(total_sleep_hours, 1),
+            "total_sleep_hours": round_centihours(stats["total_centihours"]),
             "average_sleep_per_day": round(avg_total_sleep, 1),
             "average_night_sleep": round(avg_night_sleep, 1),
             "average_naps_per_day": round(avg_naps_per_day, 1),
-            "total_nights": len(night_sleep),
-            "total_naps": len(naps),
-            "quality_distribution": self._calculate_quality_distribution(relevant_records),
-            "age_appropriate_expectations": self._get_sleep_expectations()
+            "total_nights": stats["nights"],
+            "total_naps": stats["naps"],
+            "quality_distribution": stats["quality_distribution"],
+            "age_appropriate_expectations": self._get_sleep_expectations(context)
+        }
+
+    def _get_sleep_stats(self, start_date, end_date):
+        """
+        Aggregate sleep records between two dates (inclusive)
+
+        Args:
+            start_date: First day (date)
+            end_date: Last day (date)
+
+        Returns:
+            dict: Record count, totals in hundredths of an hour, night/nap
+                counts and quality distribution
+        """
+        if self.storage.indexed:
+            return self.storage.sleep_stats(start_date.isoformat(), end_date.isoformat())
+
+        return self._snapshot.sleep_rollups.totals(start_date, end_date)
+
+    def get_sleep_series(self, date_from=None, date_to=None, bucket="day"):
+        """
+        Get sleep statistics for consecutive day, week or month buckets
+
+        Buckets are added up from the same exact statistics as the sleep
+        summary, so a bucket and a summary of the same days always agree.
+
+        Args:
+            date_from: First day (ISO format) or None for 30 days before date_to
+            date_to: Last day (ISO format) or None for today
+            bucket: "day", "week" (Monday-based) or "month"
+
+        Returns:
+            dict: Range, bucket size and per-bucket statistics
+
+        Raises:
+            ValueError: For an unknown bucket or more than MAX_SERIES_BUCKETS buckets
+        """
+        if bucket not in ("day", "week", "month"):
+            raise ValueError(f"Unknown bucket: {bucket}")
+
+        end_date = datetime.fromisoformat(date_to).date() if date_to else datetime.now().date()
+        start_date = datetime.fromisoformat(date_from).date() if date_from else end_date - timedelta(days=29)
+
+        # Bucket boundaries, clipped to the requested range
+        buckets = []
+        cursor = start_date
+        while cursor <= end_date:
+            if len(buckets) == self.MAX_SERIES_BUCKETS:
+                raise ValueError(f"Range exceeds {self.MAX_SERIES_BUCKETS} {bucket} buckets")
+            if bucket == "day":
+                bucket_end = cursor
+            elif bucket == "week":
+                bucket_end = cursor + timedelta(days=6 - cursor.weekday())
+            else:
+                next_month = (cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
+                bucket_end = next_month - timedelta(days=1)
+            bucket_end = min(bucket_end, end_date)
+            buckets.append((cursor, bucket_end))
+            cursor = bucket_end + timedelta(days=1)
+
+        series = []
+        for bucket_start, bucket_end in buckets:
+            days = (bucket_end - bucket_start).days + 1
+            stats = self._get_sleep_stats(bucket_start, bucket_end)
+            night_centihours = stats["night_centihours"]
+
+            series.append({
+                "start": bucket_start.isoformat(),
+                "end": bucket_end.isoformat(),
+                "days": days,
+                "total_sleep_hours": round_centihours(stats["total_centihours"]),
+                "average_sleep_per_day": round(stats["total_centihours"] / 100 / days, 1),
+                "average_night_sleep": round(night_centihours / 100 / stats["nights"], 1) if stats["nights"] else 0,
+                "average_naps_per_day": round(stats["naps"] / days, 1),
+                "total_nights": stats["nights"],
+                "total_naps": stats["naps"],
+                "quality_distribution": stats["quality_distribution"]
+            })
+
+        return {
+            "date_range": {
+                "start": start_date.isoformat(),
+                "end": end_date.isoformat()
+            },
+            "bucket": bucket,
+            "series": series
         }
 
     def _calculate_quality_distribution(self, records):
@@ -663,9 +1515,9 @@ class EarlyBirdSensor:
             distribution[quality] = distribution.get(quality, 0) + 1
         return distribution
 
-    def _get_sleep_expectations(self):
+    def _get_sleep_expectations(self, context=None):
         """Get age-appropriate sleep expectations"""
-        corrected_weeks = self._calculate_weeks_from_due()
+        corrected_weeks = self._calculate_weeks_from_due(context)
 
         if corrected_weeks < 6:
             return {
@@ -705,52 +1557,58 @@ class EarlyBirdSensor:
 
     def get_sleep_records(self, limit=50):
         """Get recent sleep records"""
-        records = self.data.get("sleep_records", [])
-        records_sorted = sorted(records, key=lambda x: x["start_time"], reverse=True)
-        return records_sorted[:limit]
+        return self._snapshot.sleep_index.latest(limit)
 
     # Progress Reminders Methods
 
-    def get_progress_reminder(self, weeks_back=4):
+    def get_progress_reminder(self, weeks_back=4, context=None):
         """
         Generate progress reminder showing growth over time
 
         Args:
             weeks_back: How many weeks to look back
+            context: Optional EvaluationContext of the current request
 
         Returns:
             dict: Progress summary with comparisons
         """
-        target_date = datetime.now() - timedelta(weeks=weeks_back)
+        context = context or self.create_context()
+        target_date = context.now - timedelta(weeks=weeks_back)
 
         # Current state
-        current_corrected_weeks = self._calculate_weeks_from_due()
-        current_ww = self.get_current_wonder_week()
+        current_corrected_weeks = context.corrected_weeks
+        current_ww = context.wonder_week
 
         # Milestones achieved in period
-        achievements = [
-            a for a in self.data.get("milestone_achievements", [])
-            if datetime.fromisoformat(a["date"]) >= target_date
-        ]
+        achievements = self._records_since("milestone_achievements", target_date)
 
         # Growth changes
-        growth_records = self.data.get("growth_records", [])
-        growth_sorted = sorted(growth_records, key=lambda x: x["date"])
+        if self.storage.indexed:
+            past_record = self.storage.latest_record("growth_records", until=target_date.isoformat())
+            current_record = self.storage.latest_record("growth_records")
+        else:
+            growth_records = self.data.get("growth_records", [])
+            growth_sorted = sorted(growth_records, key=lambda x: x["date"])
 
-        past_record = None
-        for record in growth_sorted:
-            if datetime.fromisoformat(record["date"]) <= target_date:
-                past_record = record
+            past_record = None
+            for record in growth_sorted:
+                if datetime.fromisoformat(record["date"]) <= target_date:
+                    past_record = record
 
-        current_record = growth_sorted[-1] if growth_sorted else None
+            current_record = growth_sorted[-1] if growth_sorted else None
 
         growth_change = None
         if past_record and current_record:
             growth_change = {
                 "weight_gain_kg": round(current_record.get("weight_kg", 0) - past_record.get("weight_kg", 0), 2),
                 "height_gain_cm": round(current_record.get("height_cm", 0) - past_record.get("height_cm", 0), 1),
-                "head_gain_cm": round(current_record.get("head_circumference_cm", 0) - past_record.get("head_circumference_cm", 0), 1)
+                "head_gain_cm": None
             }
+            # Head circumference is optional and may be missing (None) in either record
+            if current_record.get("head_circumference_cm") and past_record.get("head_circumference_cm"):
+                growth_change["head_gain_cm"] = round(
+                    current_record["head_circumference_cm"] - past_record["head_circumference_cm"], 1
+                )
 
         return {
             "weeks_back": weeks_back,
@@ -877,34 +1735,62 @@ class EarlyBirdSensor:
 
     # Pride Archive Methods
 
-    def get_pride_archive(self, filter_category=None, sort_order="desc"):
+    def get_pride_archive(self, filter_category=None, sort_order="desc", limit=None, cursor=None):
         """
         Get comprehensive timeline of all achievements and events
 
         Args:
             filter_category: Optional filter (motor, cognitive, language, life_moments, growth)
             sort_order: "asc" for chronological, "desc" for reverse chronological
+            limit: Optional page size; enables cursor pagination
+            cursor: Cursor from the previous page or None for the first page
 
         Returns:
-            dict: Timeline events with metadata
+            dict: Timeline events with metadata (and next_cursor when paginated)
         """
-        events = []
+        descending = sort_order == "desc"
+        if limit is not None:
+            limit = self._page_size(limit)
+        after = None
+        if cursor:
+            position = decode_cursor(cursor)
+            if (not isinstance(position, list) or len(position) != 3
+                    or not isinstance(position[0], str)
+                    or not all(isinstance(value, int) for value in position[1:])):
+                raise ValueError("Invalid cursor")
+            after = tuple(position)
+
+        timeline = self._snapshot.timeline
+        categories = timeline.category_counts(filter_category)
+        archive = {
+            "total_count": sum(categories.values()),
+            "categories": categories,
+            "date_range": timeline.date_range(filter_category)
+        }
 
-        # Add milestone achievements
-        for achievement in self.data.get("milestone_achievements", []):
-            events.append({
-                "type": "milestone",
-                "category": achievement["category"],
-                "title": achievement["milestone"],
-                "date": achievement["date"],
-                "corrected_age_weeks": achievement.get("corrected_age_weeks", 0),
-                "notes": achievement.get("notes", ""),
-                "icon": self._get_category_icon(achievement["category"])
-            })
+        if limit is None and cursor is None:
+            archive["events"] = timeline.events(filter_category, descending=descending)
+            return archive
+
+        events, last_key = timeline.page(limit or 50, after, filter_category, descending)
+        archive["events"] = events
+        archive["next_cursor"] = encode_cursor(list(last_key)) if last_key else None
+        return archive
 
-        # Add growth records
-        for record in self.data.get("growth_records", []):
-            events.append({
+    def _format_event(self, event_type, record):
+        """Format a stored record as a timeline event"""
+        if event_type == "milestone":
+            return {
+                "type": "milestone",
+                "category": record["category"],
+                "title": record["milestone"],
+                "date": record["date"],
+                "corrected_age_weeks": record.get("corrected_age_weeks", 0),
+                "notes": record.get("notes", ""),
+                "icon": self._get_category_icon(record["category"])
+            }
+        if event_type == "growth":
+            return {
                 "type": "growth",
                 "category": "growth",
                 "title": f"Wachstumsmessung: {record.get('weight_kg', 'N/A')} kg",
@@ -913,32 +1799,15 @@ class EarlyBirdSensor:
                 "notes": f"Größe: {record.get('height_cm', 'N/A')} cm, Kopfumfang: {record.get('head_circumference_cm', 'N/A')} cm",
                 "icon": "📏",
                 "data": record
-            })
-
-        # Add U-examinations if completed
-        for exam in self.data.get("u_examinations_records", []):
-            events.append({
-                "type": "u_examination",
-                "category": "health",
-                "title": f"{exam['exam_name']} Untersuchung",
-                "date": exam["date"],
-                "corrected_age_weeks": exam.get("corrected_age_weeks", 0),
-                "notes": exam.get("notes", ""),
-                "icon": "🏥"
-            })
-
-        # Filter by category if requested
-        if filter_category:
-            events = [e for e in events if e["category"] == filter_category]
-
-        # Sort by date
-        events.sort(key=lambda x: x["date"], reverse=(sort_order == "desc"))
-
+            }
         return {
-            "events": events,
-            "total_count": len(events),
-            "categories": self._get_event_categories(events),
-            "date_range": self._get_date_range(events)
+            "type": "u_examination",
+            "category": "health",
+            "title": f"{record['exam_name']} Untersuchung",
+            "date": record["date"],
+            "corrected_age_weeks": record.get("corrected_age_weeks", 0),
+            "notes": record.get("notes", ""),
+            "icon": "🏥"
         }
 
     def _get_category_icon(self, category):
@@ -953,25 +1822,6 @@ class EarlyBirdSensor:
         }
         return icons.get(category, "⭐")
 
-    def _get_event_categories(self, events):
-        """Get unique categories with counts"""
-        categories = {}
-        for event in events:
-            cat = event["category"]
-            categories[cat] = categories.get(cat, 0) + 1
-        return categories
-
-    def _get_date_range(self, events):
-        """Get date range of events"""
-        if not events:
-            return {"start": None, "end": None}
-
-        dates = [datetime.fromisoformat(e["date"]) for e in events]
-        return {
-            "start": min(dates).isoformat(),
-            "end": max(dates).isoformat()
-        }
-
     def get_monthly_summary(self, year_month=None):
         """
         Get summary of events for a specific month
@@ -987,16 +1837,15 @@ class EarlyBirdSensor:
 
         year, month = map(int, year_month.split("-"))
 
-        archive = self.get_pride_archive()
-        month_events = [
-            e for e in archive["events"]
-            if datetime.fromisoformat(e["date"]).year == year
-            and datetime.fromisoformat(e["date"]).month == month
-        ]
+        month_events, categories = self._snapshot.timeline.month(year, month)
 
         return {
             "year_month": year_month,
             "events": month_events,
             "count": len(month_events),
-            "categories": self._get_event_categories(month_events)
+            "categories": categories
         }
+
+
+# Time every public sensor call for the /metrics endpoint
+instrument_methods(EarlyBirdSensor, SENSOR_CALL_SECONDS)
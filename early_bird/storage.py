@@ -0,0 +1,1018 @@
+"""
+Early Bird Storage - Persistence backends for child data
+JSON snapshot with an append-only journal, or an indexed SQLite database
+"""
+import abc
+import copy
+import fcntl
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+
+from metrics import STORAGE_WRITE_BYTES, STORAGE_WRITE_SECONDS
+
+
+def apply_entry(data, entry):
+    """
+    Apply a single mutation entry to the in-memory data
+
+    Args:
+        data: Data dictionary to mutate
+        entry: Mutation entry ({"op", "section", "value"})
+
+    Returns:
+        bool: True if the data changed
+    """
+    section = data.setdefault(entry["section"], [])
+    if entry["op"] == "add" and entry["value"] in section:
+        # Set-like sections (e.g. completed U-examinations) ignore duplicates
+        return False
+    section.append(entry["value"])
+    return True
+
+
+def fsync_directory(path):
+    """
+    Sync a directory so renames and new files in it survive a crash
+
+    Args:
+        path: File whose parent directory is synced
+    """
+    fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_sections(f, data):
+    """
+    Write data in the section layout read lazily by SectionFile
+
+    Every top-level section starts on its own line and every record of a list
+    (or key of a mapping) is written on one line, so a section can be found
+    and parsed without reading the rest of the file. The result is valid JSON.
+
+    Args:
+        f: Text file opened for writing
+        data: Data dictionary
+    """
+    f.write("{\n")
+    names = list(data)
+    for position, name in enumerate(names):
+        value = data[name]
+        end = ",\n" if position < len(names) - 1 else "\n"
+        if isinstance(value, list) and value:
+            opening, closing = "[", "]"
+            items = (json.dumps(item) for item in value)
+        elif isinstance(value, dict) and value:
+            opening, closing = "{", "}"
+            # Key conversion as in json.dumps, without the braces
+            items = (json.dumps({key: item})[1:-1] for key, item in value.items())
+        else:
+            f.write(f"  {json.dumps(name)}: {json.dumps(value)}{end}")
+            continue
+        f.write(f"  {json.dumps(name)}: {opening}\n    ")
+        f.write(",\n    ".join(items))
+        f.write(f"\n  {closing}{end}")
+    f.write("}\n")
+
+
+class SectionFile:
+    """Data file in the section layout, parsed one section at a time"""
+
+    # Section header: two spaces, the quoted name and the opening bracket or value
+    HEADER = re.compile(rb'^  ("(?:[^"\\]|\\.)*"): (.*)$')
+    # Sequence number written as the last key of a record line
+    SEQ = re.compile(rb'"seq": (\d+)\},?$')
+    # Records parsed per json.loads call
+    BATCH_RECORDS = 500
+
+    def __init__(self, path):
+        """
+        Scan the section offsets and record counts of a data file
+
+        Args:
+            path: Path to the data file
+
+        Raises:
+            ValueError: If the file is not in the section layout
+        """
+        # Kept open, so sections can still be read after the file was replaced
+        self._file = open(path, 'rb')
+        self._lock = threading.Lock()
+        # Name -> ("list" | "dict", offset, count) or ("value", value, None)
+        self.sections = {}
+        # List section -> highest sequence number, None if a record has none
+        self.seq_heads = {}
+        try:
+            self._scan()
+        except ValueError:
+            self._file.close()
+            raise
+
+    def _scan(self):
+        """Index the sections line by line without parsing records"""
+        f = self._file
+        if f.readline().strip() != b"{":
+            raise ValueError("Not a section layout file")
+        offset = f.tell()
+        current = None
+        for line in f:
+            offset += len(line)
+            text = line.rstrip(b"\r\n")
+            if current:
+                name, kind, start, count = current
+                if text.startswith(b"    ") and text[4:5] not in (b" ", b""):
+                    current[3] += 1
+                    if kind == "list" and self.seq_heads[name] is not None:
+                        match = self.SEQ.search(text)
+                        self.seq_heads[name] = max(self.seq_heads[name], int(match.group(1))) if match else None
+                elif text in ((b"  ]", b"  ],") if kind == "list" else (b"  }", b"  },")):
+                    self.sections[name] = (kind, start, count)
+                    current = None
+                else:
+                    raise ValueError("Record spans several lines")
+                continue
+            if text == b"}":
+                return
+            match = self.HEADER.match(text)
+            if not match:
+                raise ValueError("Unexpected line between sections")
+            name, value = json.loads(match.group(1)), match.group(2)
+            if value in (b"[", b"{"):
+                current = [name, "list" if value == b"[" else "dict", offset, 0]
+                if value == b"[":
+                    self.seq_heads[name] = 0
+            else:
+                # A JSON value never ends with the separator
+                self.sections[name] = ("value", json.loads(value.rstrip(b",")), None)
+        raise ValueError("Truncated file")
+
+    def read(self, name):
+        """
+        Parse one section, streaming its records from the file
+
+        Args:
+            name: Section name
+
+        Returns:
+            list or dict: Section value
+        """
+        kind, offset, count = self.sections[name]
+        value = [] if kind == "list" else {}
+        opening, closing = (b"[", b"]") if kind == "list" else (b"{", b"}")
+        with self._lock:
+            self._file.seek(offset)
+            lines = itertools.islice(self._file, count)
+            while True:
+                # Records parsed together share their key strings
+                batch = b"".join(itertools.islice(lines, self.BATCH_RECORDS))
+                if not batch:
+                    break
+                records = json.loads(opening + batch.rstrip().rstrip(b",") + closing)
+                if kind == "list":
+                    value.extend(records)
+                else:
+                    value.update(records)
+        return value
+
+
+# Placeholder of a section that has not been parsed yet
+_UNLOADED = object()
+
+
+class SectionData(MutableMapping):
+    """
+    Data dictionary whose sections are parsed from the data file on first access
+
+    Appends to sections that are not loaded yet are kept aside and applied
+    when the section is loaded, so replaying the journal does not parse them.
+    """
+
+    def __init__(self, sections=None, source=None):
+        """
+        Initialize the data
+
+        Args:
+            sections: Loaded sections
+            source: Optional SectionFile providing all other sections
+        """
+        self._sections = dict(sections or {})
+        self._source = source
+        # Section -> appended values not applied yet
+        self._pending = {}
+        self._lock = threading.Lock()
+        if source:
+            for name, (kind, value, _) in source.sections.items():
+                self._sections[name] = value if kind == "value" else _UNLOADED
+
+    def __getitem__(self, name):
+        value = self._sections[name]
+        if value is _UNLOADED:
+            with self._lock:
+                value = self._sections[name]
+                if value is _UNLOADED:
+                    value = self._source.read(name)
+                    if name in self._pending:
+                        value.extend(self._pending.pop(name))
+                    self._sections[name] = value
+        return value
+
+    def __setitem__(self, name, value):
+        with self._lock:
+            self._sections[name] = value
+            self._pending.pop(name, None)
+
+    def __delitem__(self, name):
+        with self._lock:
+            del self._sections[name]
+            self._pending.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self._sections
+
+    def __iter__(self):
+        return iter(list(self._sections))
+
+    def __len__(self):
+        return len(self._sections)
+
+    def __repr__(self):
+        return f"SectionData({sorted(self._sections)})"
+
+    def copy(self):
+        """Shallow copy sharing loaded sections and the source file"""
+        with self._lock:
+            data = SectionData()
+            data._sections = dict(self._sections)
+            data._source = self._source
+            data._pending = {name: list(values) for name, values in self._pending.items()}
+        return data
+
+    def is_loaded(self, name):
+        """Check whether a section has been parsed already"""
+        return self._sections.get(name) is not _UNLOADED
+
+    def defer(self, entry):
+        """
+        Keep an append to a section that is not loaded yet for later
+
+        Args:
+            entry: Mutation entry ({"op", "section", "value"})
+
+        Returns:
+            bool: True if the entry was deferred, otherwise it has to be applied
+        """
+        section = entry["section"]
+        with self._lock:
+            if entry["op"] != "append" or self._sections.get(section) is not _UNLOADED:
+                return False
+            if self._source.sections[section][0] != "list":
+                return False
+            self._pending.setdefault(section, []).append(entry["value"])
+        return True
+
+    def records_from(self, name, start):
+        """
+        Get the records of a list section from a position on
+
+        The section is only loaded if the records are not all pending appends.
+
+        Args:
+            name: Section name
+            start: Position of the first record
+
+        Returns:
+            list: Records from start to the end
+        """
+        with self._lock:
+            if self._sections.get(name) is _UNLOADED:
+                count = self._source.sections[name][2]
+                if start >= count:
+                    return self._pending.get(name, [])[start - count:]
+        return self.get(name, [])[start:]
+
+    def seq_head(self):
+        """
+        Get the highest sequence number of all records without loading sections
+
+        Returns:
+            int or None: Highest sequence number (0 if there are no records),
+                None if a record has no sequence number yet
+        """
+        head = 0
+        with self._lock:
+            for name, value in self._sections.items():
+                if value is _UNLOADED:
+                    if self._source.sections[name][0] != "list":
+                        continue
+                    if self._source.seq_heads[name] is None:
+                        return None
+                    head = max(head, self._source.seq_heads[name])
+                    value = self._pending.get(name, ())
+                elif not isinstance(value, list):
+                    continue
+                for record in value:
+                    if isinstance(record, dict):
+                        if "seq" not in record:
+                            return None
+                        head = max(head, record["seq"])
+        return head
+
+    def record_counts(self):
+        """
+        Count the records of all list sections without loading them
+
+        Returns:
+            dict: Section -> number of records
+        """
+        counts = {}
+        with self._lock:
+            for name, value in self._sections.items():
+                if value is _UNLOADED:
+                    kind, _, count = self._source.sections[name]
+                    if kind == "list":
+                        counts[name] = count + len(self._pending.get(name, ()))
+                elif isinstance(value, list):
+                    counts[name] = len(value)
+        return counts
+
+
+def read_sections(path):
+    """
+    Open a data file for lazy per-section loading
+
+    Files written before the section layout existed are parsed completely.
+
+    Args:
+        path: Path to the data file
+
+    Returns:
+        tuple: (SectionData, bool) - the data and whether the file is in the
+            old layout and should be rewritten
+    """
+    try:
+        return SectionData(source=SectionFile(path)), False
+    except ValueError:
+        with open(path, 'r') as f:
+            return SectionData(json.load(f)), True
+
+
+class Storage(abc.ABC):
+    """Base class for storage backends with optional write-behind flushing"""
+
+    indexed = False
+    # Engine label of the storage metrics
+    engine = None
+    # The stored data is in an old format and should be rewritten by compact()
+    upgrade_pending = False
+
+    def __init__(self, flush_interval_ms=0):
+        """
+        Initialize shared storage state
+
+        Args:
+            flush_interval_ms: 0 writes every commit immediately; otherwise
+                commits are collected and written by a background flusher
+                at most once per interval
+        """
+        self.flush_interval = flush_interval_ms / 1000
+        self.lock_file = None
+        self._lock = threading.RLock()
+        self._lock_fd = None
+        self._lock_pid = None
+        self._lock_depth = 0
+        self._data = None
+        self._pending = []
+        self._wakeup = threading.Event()
+        self._flusher = None
+        self._closed = False
+
+    def commit(self, data, entry):
+        """
+        Apply a mutation to the data and persist it
+
+        Args:
+            data: Data dictionary to mutate
+            entry: Mutation entry ({"op", "section", "value"})
+
+        Returns:
+            bool: True if the data changed
+        """
+        return bool(self.commit_many(data, [entry]))
+
+    def commit_many(self, data, entries):
+        """
+        Apply a batch of mutations and persist them in one write
+
+        Args:
+            data: Data dictionary to mutate
+            entries: Mutation entries ({"op", "section", "value"})
+
+        Returns:
+            list: Entries that changed the data
+        """
+        with self._lock:
+            self._data = data
+            applied = [entry for entry in entries if apply_entry(data, entry)]
+            if not applied:
+                return applied
+            if not self.flush_interval:
+                with self.process_lock():
+                    self._write_entries(applied)
+                return applied
+            self._pending.extend(applied)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+        self._wakeup.set()
+        return applied
+
+    def flush(self):
+        """Write all pending commits"""
+        with self._lock:
+            entries, self._pending = self._pending, []
+            if entries:
+                with self.process_lock():
+                    self._write_entries(entries)
+
+    @contextmanager
+    def process_lock(self):
+        """
+        Hold the write lock shared by all worker processes
+
+        Re-entrant within a process. Without a lock file only threads of this
+        process are serialized.
+        """
+        with self._lock:
+            if self._lock_depth == 0 and self.lock_file:
+                if self._lock_pid != os.getpid():
+                    # A descriptor inherited across fork would share the parent's lock
+                    os.makedirs(os.path.dirname(self.lock_file) or ".", exist_ok=True)
+                    self._lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+                    self._lock_pid = os.getpid()
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self.lock_file:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def stale(self):
+        """Check cheaply whether other processes changed the stored data"""
+        return False
+
+    def sync(self, data):
+        """
+        Pick up changes written by other processes
+
+        Args:
+            data: Data dictionary returned by load()
+
+        Returns:
+            tuple: (data, entries) - the same data with the applied entries,
+                or newly loaded data and None if it had to be reloaded
+        """
+        return data, []
+
+    def close(self):
+        """Stop the background flusher and write pending commits"""
+        self._closed = True
+        self._wakeup.set()
+        self.flush()
+
+    def _flush_loop(self):
+        """Background flusher coalescing commits within one interval"""
+        while not self._closed:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    @abc.abstractmethod
+    def _write_entries(self, entries):
+        """Persist a batch of mutation entries (caller holds the lock)"""
+
+
+class JournalStorage(Storage):
+    """JSON snapshot with an append-only JSONL journal"""
+
+    # Journal entries after which the snapshot is rewritten in the background
+    COMPACT_THRESHOLD = 200
+
+    engine = "json"
+
+    def __init__(self, data_file, compact_threshold=None, flush_interval_ms=0):
+        """
+        Initialize journal storage
+
+        Args:
+            data_file: Path to the JSON snapshot file
+            compact_threshold: Optional override for COMPACT_THRESHOLD
+            flush_interval_ms: Write-behind interval (0 = write immediately)
+        """
+        super().__init__(flush_interval_ms)
+        self.data_file = data_file
+        self.journal_file = os.path.splitext(data_file)[0] + ".journal.jsonl"
+        self.lock_file = os.path.splitext(data_file)[0] + ".lock"
+        self.compact_threshold = compact_threshold or self.COMPACT_THRESHOLD
+        self._journal_entries = 0
+        self._compactor = None
+        # Bytes of the journal already applied and the snapshot they apply to
+        self._offset = 0
+        self._snapshot_id = None
+        self._default = None
+        # Entries of other processes read while appending our own
+        self._external = []
+
+    def load(self, default):
+        """
+        Load the snapshot and replay the journal on top of it
+
+        Args:
+            default: Data to start from when no snapshot exists
+
+        Sections of the snapshot are parsed on first access; journal entries
+        appending to them are applied at that point.
+
+        Returns:
+            SectionData: Current data
+        """
+        with self.process_lock():
+            self._default = copy.deepcopy(default)
+            data = SectionData(default)
+            self.upgrade_pending = False
+            self._snapshot_id = self._stat_snapshot()
+            if self._snapshot_id:
+                data, self.upgrade_pending = read_sections(self.data_file)
+
+            self._journal_entries = 0
+            self._offset = 0
+            self._external = []
+            for entry in self._read_journal():
+                if not data.defer(entry):
+                    apply_entry(data, entry)
+                self._journal_entries += 1
+            self._truncate_torn_tail()
+
+            self._data = data
+        self._maybe_compact()
+        return data
+
+    def sync(self, data):
+        """
+        Apply journal entries appended by other processes
+
+        A snapshot rewritten by another process (compaction) reloads all data.
+
+        Args:
+            data: Data dictionary returned by load()
+
+        Returns:
+            tuple: (data, applied entries), or (reloaded data, None)
+        """
+        with self._lock:
+            if not self.stale():
+                return data, []
+            with self.process_lock():
+                if self._stat_snapshot() != self._snapshot_id or self._journal_size() < self._offset:
+                    return self.load(copy.deepcopy(self._default)), None
+                entries, self._external = self._external + self._read_journal(), []
+                self._journal_entries += len(entries)
+                self._data = data
+                return data, [entry for entry in entries if data.defer(entry) or apply_entry(data, entry)]
+
+    def stale(self):
+        """Check whether the snapshot or journal changed since the last load or sync"""
+        return bool(self._external or self._stat_snapshot() != self._snapshot_id
+                    or self._journal_size() != self._offset)
+
+    def _stat_snapshot(self):
+        """Identity of the snapshot file (None if it does not exist)"""
+        try:
+            stat = os.stat(self.data_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _journal_size(self):
+        """Current size of the journal in bytes"""
+        try:
+            return os.path.getsize(self.journal_file)
+        except FileNotFoundError:
+            return 0
+
+    def _read_journal(self):
+        """Read complete journal entries after the applied offset and advance it"""
+        entries = []
+        if not os.path.exists(self.journal_file):
+            return entries
+        with open(self.journal_file, 'rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Incomplete line of a write still in progress
+                    break
+                self._offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # Torn line from an interrupted write
+                    continue
+        return entries
+
+    def _truncate_torn_tail(self):
+        """
+        Cut off an incomplete last line left by an interrupted write
+
+        Journal writes hold the process lock, so with the lock held (caller)
+        bytes after the last complete line can only be a torn write. Appending
+        after them would merge the next entry into an unreadable line.
+        """
+        if self._journal_size() > self._offset:
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(self._offset)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _write_entries(self, entries):
+        """Append entries to the journal in a single write"""
+        os.makedirs(os.path.dirname(self.journal_file) or ".", exist_ok=True)
+        # Entries other processes appended since the last sync are kept for
+        # the next sync() so the offset can move past our own entries
+        self._external.extend(self._read_journal())
+        self._truncate_torn_tail()
+        payload = "".join(json.dumps(entry) + "\n" for entry in entries)
+        with STORAGE_WRITE_SECONDS.time(engine=self.engine, kind="append"):
+            with open(self.journal_file, 'a') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+                self._offset = f.tell()
+        STORAGE_WRITE_BYTES.inc(len(payload.encode()), engine=self.engine, kind="append")
+        self._journal_entries += len(entries)
+        self._maybe_compact()
+
+    def save(self, data):
+        """
+        Atomically write a full snapshot and truncate the journal
+
+        The snapshot is written to a temporary file, synced and renamed over
+        the data file, so an interrupted write never leaves a partial file.
+        The journal is only emptied once the rename is synced to disk.
+        Sections not loaded yet are parsed for the write.
+
+        Args:
+            data: Complete data dictionary
+        """
+        with self.process_lock():
+            os.makedirs(os.path.dirname(self.data_file) or ".", exist_ok=True)
+            tmp_file = self.data_file + ".tmp"
+            with STORAGE_WRITE_SECONDS.time(engine=self.engine, kind="snapshot"):
+                with open(tmp_file, 'w') as f:
+                    write_sections(f, data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    written = f.tell()
+                os.replace(tmp_file, self.data_file)
+                # The rename must be durable before the journal is emptied
+                fsync_directory(self.data_file)
+            STORAGE_WRITE_BYTES.inc(written, engine=self.engine, kind="snapshot")
+            # Journal and pending entries are contained in the snapshot now
+            with open(self.journal_file, 'w') as f:
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.dirname(self.journal_file) != os.path.dirname(self.data_file):
+                fsync_directory(self.journal_file)
+            self._snapshot_id = self._stat_snapshot()
+            self._offset = 0
+            self._external = []
+            self._journal_entries = 0
+            self._pending = []
+            self._data = data
+            self.upgrade_pending = False
+
+    def compact(self):
+        """Fold the journal into the snapshot"""
+        with self.process_lock():
+            # Entries of other processes not applied yet would be lost
+            if self._external or self._journal_size() != self._offset:
+                return
+            if self._data is not None and (self._journal_entries or self._pending or self.upgrade_pending):
+                self.save(self._data)
+
+    def _maybe_compact(self):
+        """Start a background compaction once the journal is long enough"""
+        if self._journal_entries < self.compact_threshold:
+            return
+        with self._lock:
+            if self._compactor and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, daemon=True)
+            self._compactor.start()
+
+
+class SqliteStorage(Storage):
+    """SQLite database with indexed tables per record type"""
+
+    # Indexed columns per section; the full record is kept as JSON in "data"
+    TABLES = {
+        "growth_records": ["date"],
+        "milestone_achievements": ["date", "category"],
+        "sleep_records": ["date", "start_time", "sleep_type", "duration_hours", "quality"],
+        "u_examinations_records": ["date", "exam_name"]
+    }
+
+    INDEXES = [
+        "CREATE INDEX IF NOT EXISTS idx_growth_date ON growth_records (date)",
+        "CREATE INDEX IF NOT EXISTS idx_milestone_date ON milestone_achievements (date)",
+        "CREATE INDEX IF NOT EXISTS idx_sleep_date ON sleep_records (date)",
+        "CREATE INDEX IF NOT EXISTS idx_sleep_type ON sleep_records (sleep_type, date)",
+        "CREATE INDEX IF NOT EXISTS idx_u_exam_date ON u_examinations_records (date)"
+    ]
+
+    indexed = True
+    engine = "sqlite"
+
+    def __init__(self, data_file, flush_interval_ms=0):
+        """
+        Initialize SQLite storage
+
+        Args:
+            data_file: Path to the JSON data file; the database is stored next
+                to it and the JSON file is migrated on first start
+            flush_interval_ms: Write-behind interval (0 = write immediately)
+        """
+        import sqlite3
+
+        super().__init__(flush_interval_ms)
+        self.data_file = data_file
+        self.db_file = os.path.splitext(data_file)[0] + ".db"
+        self.lock_file = os.path.splitext(data_file)[0] + ".lock"
+        os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._db_version = None
+        self._default = None
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create tables and indexes if they do not exist"""
+        with self._lock, self._conn:
+            for table, columns in self.TABLES.items():
+                column_sql = "".join(f", {column}" for column in columns)
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} "
+                    f"(id INTEGER PRIMARY KEY{column_sql}, data TEXT NOT NULL)"
+                )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS u_examinations_completed (exam_name TEXT PRIMARY KEY)"
+            )
+            # Sections without a dedicated table are stored as JSON blobs
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sections (name TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            for statement in self.INDEXES:
+                self._conn.execute(statement)
+            # No longer queried, the pride archive is served from the timeline
+            self._conn.execute("DROP INDEX IF EXISTS idx_milestone_category")
+
+    def load(self, default):
+        """
+        Load all sections, migrating an existing JSON data file once
+
+        Args:
+            default: Data to start from when the database is empty
+
+        Returns:
+            SectionData: Current data, with all sections loaded
+        """
+        with self.process_lock():
+            self._default = copy.deepcopy(default)
+            if self._is_empty() and os.path.exists(self.data_file):
+                self.migrate_json()
+
+            self._db_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            data = SectionData(default)
+            for table in self.TABLES:
+                rows = self._conn.execute(f"SELECT data FROM {table} ORDER BY id")
+                data[table] = [json.loads(row[0]) for row in rows]
+            completed = self._conn.execute("SELECT exam_name FROM u_examinations_completed ORDER BY rowid")
+            data["u_examinations_completed"] = [row[0] for row in completed]
+            for name, value in self._conn.execute("SELECT name, data FROM sections"):
+                data[name] = json.loads(value)
+            self._data = data
+            return data
+
+    def sync(self, data):
+        """
+        Reload the data if another process committed to the database
+
+        Args:
+            data: Data dictionary returned by load()
+
+        Returns:
+            tuple: (data, []) if unchanged, or (reloaded data, None)
+        """
+        with self._lock:
+            if not self.stale():
+                return data, []
+            return self.load(copy.deepcopy(self._default)), None
+
+    def stale(self):
+        """Check whether another connection committed since the last load"""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0] != self._db_version
+
+    def _is_empty(self):
+        """Check whether the database holds any records yet"""
+        for table in list(self.TABLES) + ["u_examinations_completed", "sections"]:
+            if self._conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                return False
+        return True
+
+    def migrate_json(self):
+        """
+        One-shot migration of child_data.json (and its journal) into SQLite
+
+        The JSON files are renamed with a ".migrated" suffix afterwards so the
+        migration does not run again and the originals remain as a backup.
+        """
+        json_storage = JournalStorage(self.data_file, compact_threshold=float("inf"))
+        # Already holding the lock file, a second descriptor would block on it
+        json_storage.lock_file = None
+        data = json_storage.load({})
+        self.save(data)
+        for path in (self.data_file, json_storage.journal_file):
+            if os.path.exists(path):
+                os.replace(path, path + ".migrated")
+
+    def _write_entries(self, entries):
+        """Insert a batch of entries in a single transaction"""
+        with STORAGE_WRITE_SECONDS.time(engine=self.engine, kind="append"):
+            with self._conn:
+                written = sum(
+                    self._insert(entry["section"], entry["value"], self._data)
+                    for entry in entries
+                )
+        STORAGE_WRITE_BYTES.inc(written, engine=self.engine, kind="append")
+
+    def save(self, data):
+        """
+        Replace the database contents with the given data
+
+        Args:
+            data: Complete data dictionary
+        """
+        written = 0
+        with self.process_lock(), STORAGE_WRITE_SECONDS.time(engine=self.engine, kind="snapshot"):
+            with self._conn:
+                self._pending = []
+                self._data = data
+                for table in list(self.TABLES) + ["u_examinations_completed", "sections"]:
+                    self._conn.execute(f"DELETE FROM {table}")
+                for section, values in data.items():
+                    if section in self.TABLES or section == "u_examinations_completed":
+                        for value in values:
+                            written += self._insert(section, value, data)
+                    else:
+                        written += self._insert(section, values, data)
+        STORAGE_WRITE_BYTES.inc(written, engine=self.engine, kind="snapshot")
+
+    def compact(self):
+        """Nothing to compact, every commit is written in place"""
+
+    def _insert(self, section, value, data):
+        """
+        Insert a single record (caller holds the lock and transaction)
+
+        Returns:
+            int: Size of the stored value in bytes
+        """
+        if section == "u_examinations_completed":
+            self._conn.execute(
+                "INSERT OR IGNORE INTO u_examinations_completed (exam_name) VALUES (?)", (value,)
+            )
+            return len(str(value).encode())
+        if section in self.TABLES:
+            columns = self.TABLES[section]
+            placeholders = ", ".join("?" for _ in columns)
+            payload = json.dumps(value)
+            self._conn.execute(
+                f"INSERT INTO {section} ({', '.join(columns)}, data) VALUES ({placeholders}, ?)",
+                [value.get(column) for column in columns] + [payload]
+            )
+        else:
+            payload = json.dumps(data[section])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sections (name, data) VALUES (?, ?)",
+                (section, payload)
+            )
+        return len(payload.encode())
+
+    # Indexed queries
+
+    def sleep_stats(self, start_date, end_date):
+        """
+        Aggregate sleep records between two dates (inclusive)
+
+        Args:
+            start_date: First day (YYYY-MM-DD)
+            end_date: Last day (YYYY-MM-DD)
+
+        Returns:
+            dict: Record count, totals in hundredths of an hour, night/nap
+                counts and quality distribution
+        """
+        stats = {
+            "count": 0,
+            "total_centihours": 0,
+            "night_centihours": 0,
+            "nights": 0,
+            "naps": 0,
+            "quality_distribution": {"poor": 0, "normal": 0, "good": 0}
+        }
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                # Summed in exact hundredths of an hour, like the JSON rollups
+                "SELECT sleep_type, quality, COUNT(*), SUM(CAST(ROUND(duration_hours * 100) AS INTEGER)) "
+                "FROM sleep_records WHERE date BETWEEN ? AND ? GROUP BY sleep_type, quality",
+                (start_date, end_date)
+            ).fetchall()
+        for sleep_type, quality, count, centihours in rows:
+            stats["count"] += count
+            stats["total_centihours"] += centihours
+            if sleep_type == "night":
+                stats["night_centihours"] += centihours
+                stats["nights"] += count
+            elif sleep_type == "nap":
+                stats["naps"] += count
+            distribution = stats["quality_distribution"]
+            distribution[quality] = distribution.get(quality, 0) + count
+        return stats
+
+    def records_since(self, section, since):
+        """
+        Get records of a section dated at or after a point in time
+
+        Args:
+            section: Table name (e.g. "milestone_achievements")
+            since: ISO date/datetime lower bound
+
+        Returns:
+            list: Matching records in insertion order
+        """
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                f"SELECT data FROM {section} WHERE date >= ? ORDER BY id", (since,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def latest_record(self, section, until=None):
+        """
+        Get the most recent record of a section by date
+
+        Args:
+            section: Table name (e.g. "growth_records")
+            until: Optional ISO date/datetime upper bound (inclusive)
+
+        Returns:
+            dict: Latest record or None
+        """
+        query = f"SELECT data FROM {section}"
+        params = ()
+        if until:
+            query += " WHERE date <= ?"
+            params = (until,)
+        with self._lock:
+            self.flush()
+            row = self._conn.execute(query + " ORDER BY date DESC, id DESC LIMIT 1", params).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def create_storage(engine, data_file, flush_interval_ms=0):
+    """
+    Create the storage backend selected in the addon options
+
+    Args:
+        engine: "json" (snapshot + journal) or "sqlite"
+        data_file: Path to the JSON data file
+        flush_interval_ms: Write-behind interval (0 = write immediately)
+
+    Returns:
+        Storage backend instance
+    """
+    if engine == "sqlite":
+        return SqliteStorage(data_file, flush_interval_ms=flush_interval_ms)
+    return JournalStorage(data_file, flush_interval_ms=flush_interval_ms)
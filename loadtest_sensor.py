@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Load test script for the Early Bird web server
+
+Runs mixed traffic against run.py: virtual dashboards polling the API like
+the browser does plus writers posting sleep and growth records. Reports
+throughput, latency percentiles and errors per endpoint, then checks that
+every acknowledged record was stored exactly once.
+
+Usage:
+    python loadtest_sensor.py --server development
+    python loadtest_sensor.py --server production --workers 4 --dashboards 40
+    python loadtest_sensor.py --url http://homeassistant.local:8099
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+# Add the early_bird directory to path
+ADDON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'early_bird')
+sys.path.insert(0, ADDON_DIR)
+
+from sensor import EarlyBirdSensor
+
+# Requests of one dashboard refresh, as sent by templates/index.html
+DASHBOARD_REQUESTS = [
+    "/api/dashboard",
+    "/api/sleep/summary",
+    "/api/growth/chart/weight",
+    "/api/pride-archive?limit=20"
+]
+
+# Latency percentiles in the report
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Client:
+    """Keep-alive HTTP connection of one virtual user"""
+
+    def __init__(self, url, timeout=30):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._connection = None
+        # ETag per path, like the browser cache
+        self.etags = {}
+
+    def request(self, method, path, body=None):
+        """
+        Send a request, reconnecting once if the connection was closed
+
+        Returns:
+            tuple: (status, parsed JSON body or None)
+        """
+        headers = {"Accept": "application/json"}
+        if method == "GET" and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+
+        for attempt in (0, 1):
+            if self._connection is None:
+                self._connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._connection.request(method, path, payload, headers)
+                response = self._connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.close()
+                if attempt:
+                    raise
+
+        if response.getheader("ETag"):
+            self.etags[path] = response.getheader("ETag")
+        if response.getheader("Connection", "").lower() == "close":
+            self.close()
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+    def close(self):
+        """Close the connection"""
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+
+class Recorder:
+    """Latencies and outcomes of all requests, per endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.statuses = {}
+        self.errors = {}
+        # seq -> (section, marker) of every acknowledged write
+        self.writes = {}
+
+    def timed(self, client, method, path, body=None, name=None):
+        """
+        Send a request and record its latency and status
+
+        Returns:
+            Parsed JSON body, or None on errors
+        """
+        name = name or f"{method} {path.split('?')[0]}"
+        start = time.perf_counter()
+        try:
+            status, data = client.request(method, path, body)
+        except (OSError, http.client.HTTPException) as e:
+            client.close()
+            status, data = type(e).__name__, None
+        latency = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.latencies.setdefault(name, []).append(latency)
+            statuses = self.statuses.setdefault(name, {})
+            statuses[status] = statuses.get(status, 0) + 1
+            if not isinstance(status, int) or status >= 400:
+                self.errors[name] = self.errors.get(name, 0) + 1
+                return None
+        return data
+
+    def acknowledge(self, record, section, marker):
+        """Remember a write the server confirmed"""
+        with self._lock:
+            self.writes[record["seq"]] = (section, marker)
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def dashboard(url, recorder, stop, interval):
+    """Virtual dashboard: refresh all sections, then wait for the next poll"""
+    client = Client(url)
+    while not stop.is_set():
+        for path in DASHBOARD_REQUESTS:
+            recorder.timed(client, "GET", path)
+        stop.wait(interval)
+    client.close()
+
+
+def writer(url, recorder, stop, interval, number):
+    """Virtual parent: alternately post a sleep record and a growth measurement"""
+    client = Client(url)
+    count = 0
+    while not stop.is_set():
+        count += 1
+        marker = f"load-{number}-{count}"
+        if count % 2:
+            start = datetime.now().replace(microsecond=0) - timedelta(days=1)
+            record = recorder.timed(client, "POST", "/api/sleep", {
+                "sleep_type": "nap",
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(minutes=45)).isoformat(),
+                "notes": marker
+            })
+            section = "sleep_records"
+        else:
+            record = recorder.timed(client, "POST", "/api/growth", {
+                "weight_kg": round(4 + count / 1000, 3),
+                "height_cm": 55.0
+            })
+            section = "growth_records"
+        if record and "seq" in record:
+            recorder.acknowledge(record, section, marker if section == "sleep_records" else None)
+        stop.wait(interval)
+    client.close()
+
+
+def run_load(url, dashboards, writers, duration, poll_interval, write_interval):
+    """
+    Run the traffic mix for `duration` seconds
+
+    Returns:
+        tuple: (Recorder, elapsed seconds)
+    """
+    recorder = Recorder()
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=dashboard, args=(url, recorder, stop, poll_interval), daemon=True)
+        for _ in range(dashboards)
+    ] + [
+        threading.Thread(target=writer, args=(url, recorder, stop, write_interval, number), daemon=True)
+        for number in range(writers)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return recorder, time.perf_counter() - start
+
+
+def report(recorder, elapsed):
+    """
+    Print throughput, latency percentiles and errors per endpoint
+
+    Returns:
+        dict: Report with totals and per-endpoint statistics
+    """
+    endpoints = {}
+    print(f"{'endpoint':<32}{'requests':>9}{'errors':>8}{'req/s':>8}"
+          + "".join(f"{'p' + str(p):>8}" for p in PERCENTILES) + f"{'max':>8}   (ms)")
+    for name in sorted(recorder.latencies):
+        latencies = sorted(recorder.latencies[name])
+        stats = {
+            "requests": len(latencies),
+            "errors": recorder.errors.get(name, 0),
+            "throughput": round(len(latencies) / elapsed, 1),
+            "statuses": {str(k): v for k, v in recorder.statuses[name].items()},
+            **{f"p{p}_ms": round(percentile(latencies, p), 2) for p in PERCENTILES},
+            "max_ms": round(latencies[-1], 2)
+        }
+        endpoints[name] = stats
+        print(f"{name:<32}{stats['requests']:>9}{stats['errors']:>8}{stats['throughput']:>8}"
+              + "".join(f"{stats[f'p{p}_ms']:>8.1f}" for p in PERCENTILES) + f"{stats['max_ms']:>8.1f}")
+
+    total = sum(s["requests"] for s in endpoints.values())
+    errors = sum(s["errors"] for s in endpoints.values())
+    print(f"\nTotal: {total} requests in {elapsed:.1f} s ({total / elapsed:.1f} req/s), "
+          f"{errors} errors ({errors / total * 100 if total else 0:.2f}%)")
+    for name, stats in endpoints.items():
+        if stats["errors"]:
+            print(f"  {name}: {stats['statuses']}")
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "errors": errors,
+        "throughput": round(total / elapsed, 1),
+        "endpoints": endpoints
+    }
+
+
+def check_integrity(data, writes):
+    """
+    Check that every acknowledged write was stored exactly once
+
+    Args:
+        data: Data dictionary (from the export or the data file)
+        writes: {seq: (section, marker)} of acknowledged writes
+
+    Returns:
+        list: Problems found; empty if the data is intact
+    """
+    problems = []
+    stored = {}
+    for section in ("growth_records", "milestone_achievements", "sleep_records", "u_examinations_records"):
+        for record in data.get(section, []):
+            if "seq" not in record:
+                continue
+            if record["seq"] in stored:
+                problems.append(f"Duplicate seq {record['seq']} in {section}")
+            stored[record["seq"]] = (section, record.get("notes") or None)
+
+    for seq, (section, marker) in sorted(writes.items()):
+        if seq not in stored:
+            problems.append(f"Lost {section} record seq {seq}")
+        elif stored[seq][0] != section or (marker and stored[seq][1] != marker):
+            problems.append(f"Seq {seq} holds {stored[seq]} instead of {section} {marker or ''}".rstrip())
+
+    markers = [marker for _, marker in stored.values() if marker and marker.startswith("load-")]
+    if len(markers) != len(set(markers)):
+        problems.append("Sleep records stored more than once")
+    return problems
+
+
+def exported_data(url):
+    """Read all records through /api/export"""
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=120)
+    connection.request("GET", "/api/export?format=ndjson")
+    response = connection.getresponse()
+    if response.status != 200:
+        raise RuntimeError(f"Export failed with status {response.status}")
+    data = {}
+    for line in response.read().decode().splitlines():
+        row = json.loads(line)
+        data.setdefault(row.pop("section"), []).append(row)
+    connection.close()
+    return data
+
+
+def start_server(directory, args):
+    """
+    Start run.py with its own data directory
+
+    Returns:
+        subprocess.Popen
+    """
+    today = datetime.now().date()
+    with open(os.path.join(directory, "options.json"), 'w') as f:
+        json.dump({
+            "child_name": "Load Test",
+            "birth_date": (today - timedelta(days=200)).isoformat(),
+            "due_date": (today - timedelta(days=150)).isoformat(),
+            "storage_engine": args.engine,
+            "flush_interval_ms": args.flush_interval_ms,
+            "server": args.server,
+            "server_threads": args.threads,
+            "server_workers": args.workers
+        }, f)
+    process = subprocess.Popen(
+        [sys.executable, "run.py"],
+        cwd=ADDON_DIR,
+        env={**os.environ, "EARLY_BIRD_DATA_DIR": directory},
+        stdout=subprocess.DEVNULL,
+        stderr=open(os.path.join(directory, "server.log"), 'w')
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with {process.returncode}, see {directory}/server.log")
+        try:
+            if Client(args.url, timeout=2).request("GET", "/health")[0] == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Server did not start within 30 s")
+
+
+def stop_server(process):
+    """Stop the server like the Supervisor does (SIGTERM flushes pending writes)"""
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Early Bird web server")
+    parser.add_argument("--url", help="Test a running server instead of starting run.py")
+    parser.add_argument("--server", choices=["production", "development"], default="production",
+                        help="Server started by the load test")
+    parser.add_argument("--workers", type=int, default=1, help="server_workers of the started server")
+    parser.add_argument("--threads", type=int, default=8, help="server_threads of the started server")
+    parser.add_argument("--engine", choices=["json", "sqlite"], default="json", help="Storage engine")
+    parser.add_argument("--flush-interval-ms", type=int, default=0, help="flush_interval_ms of the started server")
+    parser.add_argument("--dashboards", type=int, default=20, help="Virtual dashboards polling the API")
+    parser.add_argument("--writers", type=int, default=2, help="Virtual parents posting records")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of traffic")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between dashboard refreshes")
+    parser.add_argument("--write-interval", type=float, default=0.5, help="Seconds between writes of each writer")
+    parser.add_argument("--json", metavar="FILE", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Early Bird Load Test")
+    print("=" * 60 + "\n")
+
+    directory = None
+    process = None
+    if not args.url:
+        # run.py always listens on port 8099
+        args.url = "http://127.0.0.1:8099"
+        directory = tempfile.mkdtemp(prefix="early_bird_load_")
+        print(f"Starting {args.server} server ({args.workers} worker(s), {args.threads} threads, {args.engine})...")
+        process = start_server(directory, args)
+
+    try:
+        print(f"Running {args.dashboards} dashboard(s) and {args.writers} writer(s) "
+              f"against {args.url} for {args.duration:g} s...\n")
+        recorder, elapsed = run_load(
+            args.url, args.dashboards, args.writers, args.duration, args.poll_interval, args.write_interval
+        )
+        result = report(recorder, elapsed)
+
+        print(f"\nChecking {len(recorder.writes)} acknowledged write(s)...")
+        problems = check_integrity(exported_data(args.url), recorder.writes)
+        print(f"  Export: {'OK' if not problems else f'{len(problems)} problem(s)'}")
+
+        if process:
+            stop_server(process)
+            process = None
+            # A fresh sensor reads exactly what was persisted to the data file
+            options = json.load(open(os.path.join(directory, "options.json")))
+            stored = EarlyBirdSensor(
+                child_name="Load Test",
+                birth_date=options["birth_date"],
+                due_date=options["due_date"],
+                data_file=os.path.join(directory, "child_data.json"),
+                storage_engine=args.engine
+            )
+            file_problems = check_integrity(stored.data, recorder.writes)
+            stored.close()
+            print(f"  Data file: {'OK' if not file_problems else f'{len(file_problems)} problem(s)'}")
+            problems += file_problems
+
+        for problem in problems[:20]:
+            print(f"  ✗ {problem}")
+        result["acknowledged_writes"] = len(recorder.writes)
+        result["integrity_problems"] = problems
+    finally:
+        if process:
+            stop_server(process)
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nReport written to {args.json}")
+
+    if result["errors"] or problems:
+        print("\n✗ Load test failed")
+        return 1
+    print("\n✓ Load test passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
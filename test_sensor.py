@@ -2,14 +2,20 @@
 """
 Simple test script for Early Bird sensor functionality
 """
+import glob
+import json
 import sys
 import os
 from datetime import datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
 
 # Add the early_bird directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'early_bird'))
 
-from sensor import EarlyBirdSensor
+from sensor import EarlyBirdSensor, SummaryCache
+from events import ChangeBroadcaster
+from metrics import REGISTRY, Histogram
+from profiling import RequestProfiler
 
 def test_corrected_age():
     """Test corrected age calculation"""
@@ -393,6 +399,1023 @@ def test_pride_archive(sensor):
 
     print("  ✓ Pride archive works!\n")
 
+def test_evaluation_context(sensor):
+    """Test that one evaluation context computes corrected age once"""
+    print("Testing per-request evaluation context...")
+
+    sensor._cache.invalidate()
+    calls = []
+    compute = sensor._compute_corrected_age
+    sensor._compute_corrected_age = lambda today: calls.append(today) or compute(today)
+    try:
+        context = sensor.create_context()
+        summary = sensor.get_summary(context=context)
+        sensor.get_u_examinations_status(context=context)
+        sensor.get_sleep_summary(context=context)
+        sensor.get_progress_reminder(context=context)
+    finally:
+        sensor._compute_corrected_age = compute
+
+    print(f"  Corrected age computations: {len(calls)}")
+    assert len(calls) == 1, "Corrected age computed more than once per context"
+    assert summary["age"] is context.age_info, "Summary not based on the shared context"
+
+    # A fixed reference time gives consistent results at midnight boundaries
+    midnight = datetime(2024, 5, 6, 23, 59, 59, 999999)
+    context = sensor.create_context(now=midnight)
+    assert sensor.get_current_wonder_week(context)["current_week"] == context.corrected_weeks, \
+        "Wonder week not based on context"
+    assert sensor.get_daily_encouragement(context)["date"] == midnight.isoformat(), \
+        "Encouragement not based on context"
+
+    print("  ✓ Evaluation context works!\n")
+
+def test_summary_cache(sensor):
+    """Test day/data-version keyed summary cache"""
+    print("Testing summary cache...")
+
+    sensor._cache.invalidate()
+    before = sensor.get_cache_stats()
+    first = sensor.get_summary()
+    second = sensor.get_summary()
+    sensor.get_u_examinations_status()
+    sensor.get_u_examinations_status()
+    stats = sensor.get_cache_stats()
+
+    assert second["age"] is first["age"], "Summary not served from cache"
+    # The encouragement is picked for every request, not cached with the summary
+    assert second["daily_encouragement"] is not first["daily_encouragement"], "Encouragement cached"
+    assert stats["hits"] - before["hits"] >= 2, "Cache hits not counted"
+    print(f"  Cache stats: {stats}")
+
+    # Mutators invalidate cached results
+    sensor.add_growth_record(weight_kg=4.8, height_cm=54.0)
+    third = sensor.get_summary()
+    assert third["age"] is not first["age"], "Cache not invalidated by mutation"
+    assert third["growth_records_count"] == first["growth_records_count"] + 1, "Stale summary after mutation"
+    assert sensor.get_cache_stats()["data_version"] == stats["data_version"] + 1, "Data version not incremented"
+
+    # A new corrected-age day is a new cache key
+    tomorrow = sensor.create_context(now=datetime.now() + timedelta(days=1))
+    assert sensor.get_summary(context=tomorrow)["age"] is not third["age"], "Cache ignores the corrected-age day"
+    assert all(key[-2:] == (tomorrow.corrected_day, sensor.data_version) for key in sensor._cache._entries), \
+        "Entries of earlier days or versions kept"
+
+    # The cache keeps the most recently used entries up to its size
+    cache = SummaryCache(max_entries=2)
+    for name in ("a", "b"):
+        cache.get((name, (), 10, 1), lambda: name)
+    cache.get(("a", (), 10, 1), lambda: "recomputed")
+    cache.get(("c", (), 10, 1), lambda: "c")
+    assert cache.stats()["entries"] == 2, "Cache grows past its size"
+    assert cache.get(("a", (), 10, 1), lambda: "recomputed") == "a", "Recently used entry evicted"
+    assert cache.get(("b", (), 10, 1), lambda: "recomputed") == "recomputed", "Least recently used entry kept"
+
+    print("  ✓ Summary cache works!\n")
+
+def test_dashboard(sensor):
+    """Test composite dashboard response"""
+    print("Testing dashboard...")
+
+    context = sensor.create_context()
+    dashboard = sensor.get_dashboard(context=context)
+    print(f"  Sections: {', '.join(dashboard)}")
+    assert list(dashboard) == list(sensor.DASHBOARD_SECTIONS), "Dashboard sections missing"
+    assert dashboard["age"] == sensor.calculate_corrected_age(context), "Age differs from /api/age"
+    assert dashboard["u_examinations"] == sensor.get_u_examinations_status(context), "U-examinations differ"
+
+    partial = sensor.get_dashboard(["age", "milestones"], context=context)
+    assert list(partial) == ["age", "milestones"], "Section filter ignored"
+
+    try:
+        sensor.get_dashboard(["weather"])
+        assert False, "Unknown section accepted"
+    except ValueError:
+        pass
+
+    print("  ✓ Dashboard works!\n")
+
+def test_change_stream(sensor):
+    """Test change notifications and the SSE broadcaster"""
+    print("Testing change stream...")
+
+    broadcaster = ChangeBroadcaster()
+    stream = broadcaster.stream()
+    assert next(stream).startswith("retry:"), "Stream does not start with retry hint"
+    assert broadcaster.client_count == 1, "Client not subscribed"
+
+    sensor.add_change_listener(broadcaster.publish_change)
+    sensor.add_growth_record(weight_kg=4.9, height_cm=54.5)
+    message = next(stream)
+    print(f"  Event: {message.strip()}")
+    assert message.startswith("event: change\n"), "Change event not published"
+    assert '"section": "growth_records"' in message, "Changed section missing"
+    assert f'"data_version": {sensor.data_version}' in message, "Data version missing"
+
+    stream.close()
+    assert broadcaster.client_count == 0, "Client not unsubscribed"
+    sensor._change_listeners.remove(broadcaster.publish_change)
+
+    print("  ✓ Change stream works!\n")
+
+def test_snapshots(sensor):
+    """Test that writers publish new snapshots instead of modifying the current one"""
+    print("Testing copy-on-write snapshots...")
+
+    before = sensor._snapshot
+    growth_count = len(before.data["growth_records"])
+    sleep_count = len(before.sleep_index)
+    archive_count = len(before.timeline.events())
+    head = before.changes.head
+
+    sensor.add_growth_record(weight_kg=5.1, height_cm=56.0)
+    sensor.add_sleep_record("nap", "2024-06-01T13:00:00", "2024-06-01T14:00:00")
+    after = sensor._snapshot
+
+    assert after is not before, "No new snapshot published"
+    assert len(before.data["growth_records"]) == growth_count, "Old snapshot data modified"
+    assert len(before.sleep_index) == sleep_count, "Old sleep index modified"
+    assert len(before.timeline.events()) == archive_count, "Old timeline modified"
+    assert before.changes.head == head, "Old change feed modified"
+    assert len(after.data["growth_records"]) == growth_count + 1, "New record missing"
+    assert len(after.sleep_index) == sleep_count + 1, "New sleep record not indexed"
+    assert after.version == before.version + 2, "Snapshot version not advanced"
+    # Sections that were not written are shared, not copied
+    assert after.data["milestone_achievements"] is before.data["milestone_achievements"], "Untouched section copied"
+    print(f"  Snapshot version {before.version} -> {after.version}")
+
+    print("  ✓ Copy-on-write snapshots work!\n")
+
+def test_metrics(sensor):
+    """Test Prometheus metrics of sensor calls and storage writes"""
+    print("Testing metrics...")
+
+    histogram = Histogram("test_duration_seconds", "Test histogram", labels=("route",), buckets=(0.1, 1))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5, route="/a")
+    lines = histogram.render()
+    assert 'test_duration_seconds_bucket{route="/a",le="0.1"} 1' in lines, "Bucket not cumulative"
+    assert 'test_duration_seconds_bucket{route="/a",le="1"} 2' in lines, "Bucket not cumulative"
+    assert 'test_duration_seconds_bucket{route="/a",le="+Inf"} 3' in lines, "+Inf bucket missing"
+    assert 'test_duration_seconds_count{route="/a"} 3' in lines, "Count missing"
+
+    sensor.get_summary()
+    sensor.add_growth_record(weight_kg=5.2, height_cm=56.5)
+    output = REGISTRY.render()
+    print(f"  Rendered {len(output.splitlines())} lines")
+    assert "# TYPE early_bird_sensor_call_duration_seconds histogram" in output, "Sensor histogram missing"
+    assert 'early_bird_sensor_call_duration_seconds_count{method="get_summary"}' in output, "Sensor call not timed"
+    assert 'early_bird_storage_write_duration_seconds_count{engine="json",kind="append"}' in output, "Storage write not timed"
+    assert 'early_bird_storage_written_bytes_total{engine="json",kind="append"}' in output, "Written bytes missing"
+
+    print("  ✓ Metrics work!\n")
+
+def test_profiling(sensor):
+    """Test storing request profiles and their reports"""
+    print("Testing request profiling...")
+
+    import shutil
+    directory = "/tmp/test_profiles"
+    shutil.rmtree(directory, ignore_errors=True)
+    profiler = RequestProfiler(directory, max_profiles=2, top=5)
+
+    ids = []
+    for _ in range(3):
+        profile = profiler.start()
+        assert profile is not None, "Profiler not started"
+        assert profiler.start() is None, "Second profile started concurrently"
+        sensor.get_summary()
+        ids.append(profiler.save(profile, "GET", "/api/summary?x=1", 200, 12.5))
+
+    profiles = profiler.recent()
+    print(f"  Stored profiles: {[p['id'] for p in profiles]}")
+    assert [p["id"] for p in profiles] == ids[:0:-1], "Old profiles not pruned"
+    assert profiles[0]["request"] == "GET /api/summary?x=1 -> 200 in 12.5 ms", "Request summary missing"
+    with open(os.path.join(directory, profiles[0]["report"])) as f:
+        assert "get_summary" in f.read(), "Sensor call missing from report"
+    assert os.path.getsize(os.path.join(directory, profiles[0]["prof"])) > 0, "Empty .prof file"
+
+    profile = profiler.start()
+    profiler.stop(profile)
+    assert len(profiler.recent()) == 2, "Stopped profile was saved"
+    shutil.rmtree(directory, ignore_errors=True)
+
+    print("  ✓ Request profiling works!\n")
+
+def test_benchmark_history():
+    """Test the benchmark history generator and baseline comparison"""
+    print("Testing benchmark history generator...")
+
+    import benchmark_sensor
+
+    end = datetime(2024, 6, 1)
+    first = benchmark_sensor.generate_history(1, seed=7, end=end)
+    second = benchmark_sensor.generate_history(1, seed=7, end=end)
+    assert first == second, "Generated history not deterministic"
+    birth_date, due_date, rows = first
+    assert birth_date == "2023-06-02", f"Wrong birth date: {birth_date}"
+    sections = {row["section"] for row in rows}
+    assert sections == {"growth_records", "milestone_achievements", "sleep_records", "u_examinations_records"}, sections
+    print(f"  Generated {len(rows)} records")
+
+    results = {"1y": {"timings": {"a": {"median_ms": 10.0}, "b": {"median_ms": 0.2}}}}
+    baseline = {"results": {"1y": {"timings": {"a": {"median_ms": 5.0}, "b": {"median_ms": 0.1}}}}}
+    regressions = benchmark_sensor.compare(results, baseline, threshold=0.25, min_delta_ms=0.5)
+    # "b" is twice as slow but below the noise floor
+    assert regressions == [("1y", "a", 5.0, 10.0)], f"Wrong regressions: {regressions}"
+
+    print("  ✓ Benchmark history generator works!\n")
+
+def test_load_test_integrity():
+    """Test the load test percentiles and data integrity check"""
+    print("Testing load test integrity check...")
+
+    import loadtest_sensor
+
+    latencies = sorted(float(n) for n in range(1, 101))
+    assert loadtest_sensor.percentile(latencies, 50) == 50, "Wrong p50"
+    assert loadtest_sensor.percentile(latencies, 99) == 99, "Wrong p99"
+
+    data = {
+        "growth_records": [{"seq": 1, "weight_kg": 4.0}],
+        "sleep_records": [{"seq": 2, "notes": "load-0-1"}, {"seq": 3, "notes": "load-0-3"}]
+    }
+    writes = {1: ("growth_records", None), 2: ("sleep_records", "load-0-1"), 3: ("sleep_records", "load-0-3")}
+    assert loadtest_sensor.check_integrity(data, writes) == [], "Intact data reported as broken"
+
+    writes[4] = ("growth_records", None)
+    data["sleep_records"].append({"seq": 3, "notes": "load-0-3"})
+    problems = loadtest_sensor.check_integrity(data, writes)
+    print(f"  Problems: {problems}")
+    assert "Lost growth_records record seq 4" in problems, "Lost record not reported"
+    assert "Duplicate seq 3 in sleep_records" in problems, "Duplicate record not reported"
+
+    print("  ✓ Load test integrity check works!\n")
+
+def test_startup_readiness():
+    """Test that the server answers while the data is loading"""
+    print("Testing startup readiness...")
+
+    import shutil
+    import tempfile
+    directory = tempfile.mkdtemp(prefix="test_startup_")
+    os.environ["EARLY_BIRD_DATA_DIR"] = directory
+    import run
+    run.STARTUP_WAIT_SECONDS = 0.1
+    client = run.app.test_client()
+
+    health = client.get("/health").get_json()
+    assert health["status"] == "starting", f"Wrong status before loading: {health}"
+    response = client.get("/api/age")
+    assert response.status_code == 503, f"API answered before loading: {response.status_code}"
+    assert response.headers.get("Retry-After") == "5", "Retry-After missing"
+
+    run.load_data()
+    health = client.get("/health").get_json()
+    print(f"  Startup: {health}")
+    assert health["status"] == "ready", "Not ready after loading"
+    assert health["startup_ms"]["ready"] >= health["startup_ms"]["imports"], "Startup phases out of order"
+    assert client.get("/api/age").status_code == 200, "API not answering after loading"
+
+    run.sensor.close()
+    del os.environ["EARLY_BIRD_DATA_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+
+    print("  ✓ Startup readiness works!\n")
+
+def test_lazy_sections():
+    """Test that data file sections are parsed on first use"""
+    print("Testing lazy section loading...")
+
+    import shutil
+    import tempfile
+    directory = tempfile.mkdtemp(prefix="test_sections_")
+    data_file = os.path.join(directory, "child_data.json")
+
+    # Files written before the section layout are read completely and rewritten once
+    with open(data_file, "w") as f:
+        json.dump({
+            "growth_records": [{"date": "2024-03-01T10:00:00", "weight_kg": 3.2, "height_cm": 48.0}],
+            "sleep_records": [{
+                "date": "2024-04-30", "start_time": "2024-04-30T13:00:00", "end_time": "2024-04-30T14:00:00",
+                "sleep_type": "nap", "duration_hours": 1.0, "quality": "normal", "notes": ""
+            }],
+            "notes": {"first": "Hello, \"world\",", "list": [1, 2]}
+        }, f, indent=2)
+    sensor = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    for hour in range(3):
+        sensor.add_sleep_record("nap", f"2024-05-01T1{hour}:00:00", f"2024-05-01T1{hour}:45:00")
+    sensor.add_growth_record(weight_kg=3.9, height_cm=50.5)
+    sensor.close()
+    with open(data_file) as f:
+        lines = f.readlines()
+    assert lines[1] == '  "growth_records": [\n', "Old file not rewritten"
+    assert all(not line.startswith("     ") for line in lines), "Record split over several lines"
+
+    # Journal appends to sections that are not loaded yet are applied on first use
+    reloaded = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    assert not reloaded.storage.upgrade_pending, "Section layout not recognized"
+    reloaded.get_summary()
+    reloaded.get_sleep_summary("2024-05-01", 1)
+    loaded = [name for name in reloaded.data if reloaded.data.is_loaded(name)]
+    print(f"  Loaded after summaries: {loaded}")
+    assert not reloaded.data.is_loaded("sleep_records"), "Sleep records parsed for summaries"
+    assert reloaded.data_version == sensor.data_version, "Version differs before loading"
+    assert reloaded.get_sleep_summary("2024-05-01", 1)["total_naps"] == 4, "Rollups wrong"
+    assert len(reloaded.get_sleep_records(10)) == 4, "Journal append not applied"
+    assert reloaded.data == sensor.data, "Lazy data differs"
+    assert reloaded.data["notes"]["first"] == 'Hello, "world",', "Mapping section differs"
+    reloaded.close()
+
+    # Writes continue the sequence numbers without parsing other sections
+    writer = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    writer.add_growth_record(weight_kg=4.1, height_cm=51.0)
+    assert not writer.data.is_loaded("sleep_records"), "Sleep records parsed for a growth write"
+    assert "changes" not in writer._snapshot.built_indexes(), "Change feed built for a write"
+    head = sensor.get_changes()["head"]
+    assert writer.data["growth_records"][-1]["seq"] == head + 1, "Sequence number not after head"
+    writer.close()
+
+    shutil.rmtree(directory, ignore_errors=True)
+
+    print("  ✓ Lazy section loading works!\n")
+
+def test_conditional_requests():
+    """Test ETag and If-Modified-Since revalidation of API GETs"""
+    print("Testing conditional requests...")
+
+    import shutil
+    import tempfile
+    import time
+    from werkzeug.http import http_date
+    directory = tempfile.mkdtemp(prefix="test_conditional_")
+    os.environ["EARLY_BIRD_DATA_DIR"] = directory
+    import run
+    run.DATA_DIR = directory
+    run.load_data()
+    client = run.app.test_client()
+
+    # Start early in a second, so both writes below happen in the same second
+    time.sleep(1.05 - datetime.now().microsecond / 1e6)
+    run.sensor.add_growth_record(weight_kg=3.8, height_cm=51.0)
+    first = client.get("/api/growth")
+    etag, modified = first.headers["ETag"], first.headers["Last-Modified"]
+    assert first.status_code == 200 and etag and modified, "Validators missing"
+    assert client.get("/api/growth", headers={"If-None-Match": etag}).status_code == 304, "ETag match not 304"
+
+    run.sensor.add_growth_record(weight_kg=4.0, height_cm=52.0)
+    changed = client.get("/api/growth", headers={"If-None-Match": etag})
+    assert changed.status_code == 200, "Stale ETag answered with 304"
+    assert changed.headers["ETag"] != etag, "ETag not changed by write"
+    assert changed.headers["Last-Modified"] == modified, "Write not in the same second"
+    same_second = client.get("/api/growth", headers={"If-Modified-Since": modified})
+    print(f"  Write in the same second as Last-Modified {modified}: {same_second.status_code}")
+    assert same_second.status_code == 200, "Write in the same second answered with 304"
+
+    # A date after the last change is still answered with 304
+    time.sleep(1.05)
+    later = client.get("/api/growth", headers={"If-Modified-Since": http_date(time.time())})
+    assert later.status_code == 304, "Later If-Modified-Since not 304"
+
+    run.sensor.close()
+    del os.environ["EARLY_BIRD_DATA_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+
+    print("  ✓ Conditional requests work!\n")
+
+def test_export(sensor):
+    """Test streaming NDJSON and CSV export"""
+    print("Testing export...")
+
+    import csv
+    import io
+
+    growth_count = len(sensor.data["growth_records"])
+    sleep_count = len(sensor.data["sleep_records"])
+
+    lines = "".join(sensor.export_records(["growth_records", "sleep_records"])).splitlines()
+    rows = [json.loads(line) for line in lines]
+    print(f"  NDJSON lines: {len(rows)}")
+    assert len(rows) == growth_count + sleep_count, "Wrong number of NDJSON lines"
+    assert rows[0]["section"] == "growth_records", "Section missing from NDJSON"
+    assert rows[-1]["section"] == "sleep_records", "Sections out of order"
+
+    chunks = list(sensor.export_records(["sleep_records"], fmt="csv"))
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    print(f"  CSV rows: {len(rows)} in {len(chunks)} chunk(s)")
+    assert len(rows) == sleep_count, "Wrong number of CSV rows"
+    assert rows[0]["sleep_type"] == sensor.data["sleep_records"][0]["sleep_type"], "CSV values wrong"
+
+    for sections, fmt in ((["weather"], "csv"), (None, "xml")):
+        try:
+            sensor.export_records(sections, fmt)
+            assert False, "Invalid export accepted"
+        except ValueError:
+            pass
+
+    print("  ✓ Export works!\n")
+
+def test_change_feed():
+    """Test sequence numbers and delta sync"""
+    print("Testing change feed...")
+
+    data_file = "/tmp/test_changes_data.json"
+    journal_file = "/tmp/test_changes_data.journal.jsonl"
+    if os.path.exists(journal_file):
+        os.remove(journal_file)
+
+    # Records stored before sequence numbers existed are numbered on load
+    with open(data_file, "w") as f:
+        json.dump({
+            "growth_records": [{
+                "date": "2024-03-01T10:00:00", "corrected_age_weeks": 0, "actual_age_weeks": 8,
+                "weight_kg": 3.2, "height_cm": 48.0, "head_circumference_cm": None
+            }],
+            "milestone_achievements": [{
+                "date": "2024-03-05T10:00:00", "corrected_age_weeks": 1,
+                "category": "social", "milestone": "Follows faces", "notes": ""
+            }]
+        }, f)
+    sensor = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    assert sensor.get_changes()["head"] == 2, "Legacy records not numbered"
+
+    sensor.add_growth_record(weight_kg=3.9, height_cm=50.5)
+    sensor.mark_u_examination_completed("U3")
+    feed = sensor.get_changes(since=2)
+    print(f"  Head: {feed['head']}, changes since 2: {[c['section'] for c in feed['changes']]}")
+    assert feed["head"] == 4, "Head not advanced"
+    assert [c["seq"] for c in feed["changes"]] == [3, 4], "Wrong delta"
+    assert feed["changes"][1]["section"] == "u_examinations_records", "Wrong section"
+    assert sensor.get_changes(since=4)["changes"] == [], "Changes after head"
+
+    page = sensor.get_changes(since=0, limit=3)
+    assert len(page["changes"]) == 3 and page["has_more"], "Limit ignored"
+
+    # Sequence numbers survive a restart
+    reloaded = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    assert reloaded.get_changes() == sensor.get_changes(), "Feed differs after reload"
+    reloaded.add_growth_record(weight_kg=4.1, height_cm=51.0)
+    assert reloaded.get_changes(since=4)["changes"][0]["seq"] == 5, "Sequence restarted"
+
+    for path in (data_file, journal_file):
+        os.remove(path)
+
+    print("  ✓ Change feed works!\n")
+
+def test_import():
+    """Test bulk import with per-line errors and a single write"""
+    print("Testing import...")
+
+    data_file = "/tmp/test_import_data.json"
+    copy_file = "/tmp/test_import_copy.json"
+    journal_files = ("/tmp/test_import_data.journal.jsonl", "/tmp/test_import_copy.journal.jsonl")
+    for path in journal_files:
+        if os.path.exists(path):
+            os.remove(path)
+
+    sensor = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    writes = []
+    write_entries = sensor.storage._write_entries
+    sensor.storage._write_entries = lambda entries: writes.append(len(entries)) or write_entries(entries)
+
+    lines = [
+        json.dumps({"section": "growth_records", "date": "2024-04-01", "weight_kg": 3.5, "height_cm": 50}),
+        json.dumps({"section": "sleep_records", "sleep_type": "nap",
+                    "start_time": "2024-04-02T13:00:00", "end_time": "2024-04-02T14:30:00"}),
+        "not json",
+        json.dumps({"section": "growth_records", "date": "2024-04-08", "height_cm": 51}),
+        json.dumps({"section": "u_examinations_records", "exam_name": "U3", "date": "2024-04-03"}),
+        json.dumps({"section": "milestone_achievements", "date": "2023-12-01",
+                    "category": "motor", "milestone": "Too early"})
+    ]
+    result = sensor.import_records(lines)
+    print(f"  Imported: {result['imported']}, errors: {[e['line'] for e in result['errors']]}")
+    assert result["error_count"] == 3, "Invalid lines not reported"
+    assert [e["line"] for e in result["errors"]] == [3, 4, 6], "Wrong error lines"
+    assert writes == [4], "Import not persisted with one write"
+    assert sensor.data["u_examinations_completed"] == ["U3"], "Examination not marked completed"
+
+    # Corrected age is evaluated at the record date, not at import time
+    growth = sensor.data["growth_records"][0]
+    assert growth["corrected_age_weeks"] == 5, "Corrected age not computed for historical date"
+    assert sensor.data["sleep_records"][0]["duration_hours"] == 1.5, "Sleep duration not calculated"
+
+    # CSV without a section column uses the default section
+    csv_lines = [
+        "sleep_type,start_time,end_time,quality\n",
+        "night,2024-05-01T20:00:00,2024-05-02T06:00:00,good\n",
+        "night,2024-05-02T20:00:00,2024-05-03T06:00:00,excellent\n"
+    ]
+    result = sensor.import_records(csv_lines, fmt="csv", default_section="sleep_records")
+    assert result["imported"]["sleep_records"] == 1, "CSV row not imported"
+    assert result["errors"][0]["line"] == 3, "CSV error line wrong"
+
+    # Measurements must be finite positive numbers
+    bad_lines = [
+        '{"section": "growth_records", "date": "2024-04-10", "weight_kg": NaN, "height_cm": 51}',
+        json.dumps({"section": "growth_records", "date": "2024-04-10", "weight_kg": "inf", "height_cm": 51}),
+        json.dumps({"section": "growth_records", "date": "2024-04-10", "weight_kg": 3.6, "height_cm": -51}),
+        json.dumps({"section": "growth_records", "date": "2024-04-10", "weight_kg": 3.6, "height_cm": 51,
+                    "head_circumference_cm": 0})
+    ]
+    result = sensor.import_records(bad_lines)
+    assert result["error_count"] == 4, "Invalid measurements imported"
+    assert result["imported"]["growth_records"] == 0, "Invalid measurement stored"
+
+    # Exported records import into a fresh sensor
+    other = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=copy_file)
+    exported = "".join(sensor.export_records(fmt="csv")).splitlines(keepends=True)
+    result = other.import_records(exported, fmt="csv")
+    assert result["error_count"] == 0, f"Export does not re-import: {result['errors']}"
+    without_seq = lambda records: [{k: v for k, v in r.items() if k != "seq"} for r in records]
+    assert without_seq(other.data["sleep_records"]) == without_seq(sensor.data["sleep_records"]), \
+        "Round trip changed records"
+
+    for path in journal_files:
+        os.remove(path)
+
+    print("  ✓ Import works!\n")
+
+def test_concurrent_access():
+    """Test concurrent writers and readers"""
+    print("Testing concurrent access...")
+
+    import threading
+
+    data_file = "/tmp/test_concurrent_data.json"
+    journal_file = "/tmp/test_concurrent_data.journal.jsonl"
+    for path in (data_file, journal_file):
+        if os.path.exists(path):
+            os.remove(path)
+    sensor = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    errors = []
+
+    def write(worker):
+        try:
+            for i in range(25):
+                day = 1 + (worker * 25 + i) % 28
+                sensor.add_sleep_record("nap", f"2024-05-{day:02d}T13:00:00", f"2024-05-{day:02d}T14:00:00")
+                sensor.add_growth_record(weight_kg=4.0 + i / 100, height_cm=52.0)
+        except Exception as e:
+            errors.append(e)
+
+    def read():
+        try:
+            for _ in range(50):
+                sensor.get_sleep_summary("2024-05-28", days_back=30)
+                sensor.get_sleep_records(limit=10)
+                sensor.get_pride_archive(limit=5)
+                sensor.get_changes(since=0, limit=20)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+    threads += [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, f"Concurrent access failed: {errors[0]!r}"
+    seqs = [change["seq"] for change in sensor.get_changes()["changes"]]
+    print(f"  Records: {len(seqs)}, head: {seqs[-1]}")
+    assert seqs == list(range(1, 201)), "Sequence numbers not unique and contiguous"
+    assert len(sensor.get_sleep_records(limit=1000)) == 100, "Sleep records lost"
+
+    # 200 records trigger a compaction; wait for it before reloading
+    compactor = sensor.storage._compactor
+    if compactor:
+        compactor.join()
+    reloaded = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    assert len(reloaded.data["growth_records"]) == 100, "Storage lost records"
+    for path in (data_file, journal_file):
+        if os.path.exists(path):
+            os.remove(path)
+
+    print("  ✓ Concurrent access works!\n")
+
+def test_multi_worker():
+    """Test sensors of several worker processes sharing one data file"""
+    print("Testing multi-worker storage...")
+
+    data_file = "/tmp/test_workers_data.json"
+    journal_file = "/tmp/test_workers_data.journal.jsonl"
+    for path in (data_file, journal_file):
+        if os.path.exists(path):
+            os.remove(path)
+
+    worker_a = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    worker_b = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+
+    # Records of one worker are applied as deltas by the other
+    worker_a.add_growth_record(weight_kg=4.0, height_cm=52.0)
+    worker_b.refresh()
+    assert len(worker_b.data["growth_records"]) == 1, "Delta not applied"
+    assert worker_b.data_version == worker_a.data_version, "Data versions differ"
+
+    # Sequence numbers continue across workers
+    worker_b.add_sleep_record("nap", "2024-05-01T13:00:00", "2024-05-01T14:00:00")
+    assert worker_b.data["sleep_records"][0]["seq"] == 2, "Sequence number reused"
+    worker_a.refresh()
+    assert worker_a.get_sleep_records(limit=5) == worker_b.get_sleep_records(limit=5), "Sleep index not updated"
+
+    # A snapshot written by one worker is reloaded by the other
+    worker_a.storage.compact()
+    worker_b.refresh()
+    worker_b.add_growth_record(weight_kg=4.2, height_cm=52.5)
+    worker_a.refresh()
+    assert worker_a.get_changes() == worker_b.get_changes(), "Workers diverged after compaction"
+
+    # Concurrent writers in separate processes
+    pids = []
+    for worker in range(3):
+        pid = os.fork()
+        if pid == 0:
+            child = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+            for i in range(10):
+                child.add_growth_record(weight_kg=5.0 + worker + i / 100, height_cm=55.0)
+            os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    worker_a.refresh()
+    seqs = [change["seq"] for change in worker_a.get_changes()["changes"]]
+    print(f"  Records after 3 writer processes: {len(seqs)}")
+    assert seqs == list(range(1, 34)), "Records lost or sequence numbers duplicated"
+
+    for path in (data_file, journal_file, "/tmp/test_workers_data.lock"):
+        if os.path.exists(path):
+            os.remove(path)
+
+    print("  ✓ Multi-worker storage works!\n")
+
+def test_journal_storage():
+    """Test append-only journal persistence and compaction"""
+    print("Testing journal storage...")
+
+    data_file = "/tmp/test_journal_data.json"
+    journal_file = "/tmp/test_journal_data.journal.jsonl"
+    for path in (data_file, journal_file):
+        if os.path.exists(path):
+            os.remove(path)
+
+    sensor = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    sensor.add_growth_record(weight_kg=3.9, height_cm=50.5)
+    sensor.add_sleep_record("nap", "2024-05-01T13:00:00", "2024-05-01T14:30:00")
+    # Completion and examination record are saved with one write
+    writes = []
+    write_entries = sensor.storage._write_entries
+    sensor.storage._write_entries = lambda entries: writes.append(len(entries)) or write_entries(entries)
+    sensor.mark_u_examination_completed("U3")
+    sensor.mark_u_examination_completed("U3")
+    del sensor.storage._write_entries
+    assert writes == [2, 1], f"Examination not saved with one write per call: {writes}"
+
+    # Mutations only append to the journal, the snapshot is not written
+    assert not os.path.exists(data_file), "Snapshot written on every mutation"
+    with open(journal_file) as f:
+        journal_lines = f.readlines()
+    print(f"  Journal entries: {len(journal_lines)}")
+    assert len(journal_lines) == 5, "Unexpected number of journal entries"
+
+    # Replaying the journal restores the same data
+    reloaded = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    assert reloaded.data == sensor.data, "Journal replay does not match"
+    assert reloaded.data["u_examinations_completed"] == ["U3"], "Duplicate exam after replay"
+
+    # Compaction folds the journal into the snapshot
+    reloaded.storage.compact()
+    assert os.path.getsize(journal_file) == 0, "Journal not truncated after compaction"
+    compacted = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    assert compacted.data == sensor.data, "Snapshot does not match after compaction"
+
+    # A torn last line of an interrupted write is cut off before the next append
+    fragment = '{"op": "append", "section": "growth_records", "val'
+    with open(journal_file, "a") as f:
+        f.write(fragment)
+    torn = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    torn.add_growth_record(weight_kg=4.2, height_cm=52.0)
+    # Also when another process crashed after this one loaded
+    with open(journal_file, "a") as f:
+        f.write(fragment)
+    torn.add_growth_record(weight_kg=4.3, height_cm=52.5)
+    growth_count = len(torn.data["growth_records"])
+    restarted = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    print(f"  Growth records after torn writes: {len(restarted.data['growth_records'])}/{growth_count}")
+    assert len(restarted.data["growth_records"]) == growth_count, "Record after torn line lost"
+    assert restarted.data == torn.data, "Data differs after torn writes"
+
+    for path in (data_file, journal_file):
+        os.remove(path)
+
+    print("  ✓ Journal storage works!\n")
+
+def test_sqlite_storage():
+    """Test SQLite storage migration and indexed queries"""
+    print("Testing SQLite storage...")
+
+    data_file = "/tmp/test_sqlite_data.json"
+    db_file = "/tmp/test_sqlite_data.db"
+    for path in (data_file, db_file, data_file + ".migrated"):
+        if os.path.exists(path):
+            os.remove(path)
+
+    json_sensor = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    json_sensor.add_growth_record(weight_kg=3.9, height_cm=50.5, head_circumference_cm=35.0)
+    json_sensor.add_growth_record(weight_kg=4.4, height_cm=52.0, head_circumference_cm=36.5)
+    json_sensor.add_milestone_achievement("motor", "Holds head steady")
+    json_sensor.add_milestone_achievement("language", "Coos")
+    json_sensor.mark_u_examination_completed("U4", notes="All good")
+    today = datetime.now().replace(hour=20, minute=0, second=0, microsecond=0)
+    json_sensor.add_sleep_record("night", today.isoformat(), (today + timedelta(hours=9)).isoformat(), quality="good")
+    json_sensor.add_sleep_record("nap", (today - timedelta(hours=6)).isoformat(), (today - timedelta(hours=5)).isoformat())
+    json_sensor._save_data()
+
+    # First start with the SQLite engine migrates the JSON data
+    sqlite_sensor = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26",
+                                    data_file=data_file, storage_engine="sqlite")
+    assert os.path.exists(data_file + ".migrated"), "JSON file not marked as migrated"
+    assert sqlite_sensor.data == json_sensor.data, "Migrated data does not match"
+    print(f"  Migrated {len(sqlite_sensor.get_growth_history())} growth records")
+
+    # Indexed queries return the same results as the in-memory implementation
+    month = datetime.now().strftime("%Y-%m")
+    assert sqlite_sensor.get_sleep_summary() == json_sensor.get_sleep_summary(), "Sleep summary differs"
+    sqlite_reminder = sqlite_sensor.get_progress_reminder()
+    json_reminder = json_sensor.get_progress_reminder()
+    sqlite_reminder.pop("target_date")
+    json_reminder.pop("target_date")
+    assert sqlite_reminder == json_reminder, "Progress reminder differs"
+    assert sqlite_sensor.get_pride_archive() == json_sensor.get_pride_archive(), "Pride archive differs"
+    assert sqlite_sensor.get_pride_archive("motor", "asc") == json_sensor.get_pride_archive("motor", "asc"), \
+        "Filtered pride archive differs"
+    assert sqlite_sensor.get_monthly_summary(month) == json_sensor.get_monthly_summary(month), "Monthly summary differs"
+
+    # New records are written to the database
+    sqlite_sensor.add_milestone_achievement("cognitive", "Smiles responsively")
+    reloaded = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26",
+                               data_file=data_file, storage_engine="sqlite")
+    assert len(reloaded.get_milestone_history()) == 3, "Milestone not persisted in SQLite"
+
+    for path in (db_file, data_file + ".migrated"):
+        os.remove(path)
+
+    print("  ✓ SQLite storage works!\n")
+
+def test_write_behind():
+    """Test coalesced background flushing and atomic snapshots"""
+    print("Testing write-behind storage...")
+
+    data_file = "/tmp/test_write_behind.json"
+    journal_file = "/tmp/test_write_behind.journal.jsonl"
+    for path in (data_file, journal_file):
+        if os.path.exists(path):
+            os.remove(path)
+
+    sensor = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26",
+                             data_file=data_file, flush_interval_ms=200)
+    for hour in range(8, 14):
+        sensor.add_sleep_record("nap", f"2024-05-01T{hour:02d}:00:00", f"2024-05-01T{hour:02d}:30:00")
+
+    # Mutations return before anything is written
+    assert not os.path.exists(journal_file), "Write-behind mode wrote synchronously"
+    assert len(sensor.get_sleep_records()) == 6, "Records missing from memory"
+
+    # Closing flushes all pending records in one batch
+    sensor.close()
+    with open(journal_file) as f:
+        assert len(f.readlines()) == 6, "Pending records not flushed"
+    reloaded = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    assert reloaded.data == sensor.data, "Flushed data does not match"
+
+    # Snapshots are replaced atomically without leaving a temp file behind
+    reloaded._save_data()
+    assert not os.path.exists(data_file + ".tmp"), "Temporary snapshot left behind"
+    print(f"  Snapshot size: {os.path.getsize(data_file)} bytes")
+
+    for path in (data_file, journal_file):
+        os.remove(path)
+
+    print("  ✓ Write-behind storage works!\n")
+
+def test_sleep_index():
+    """Test sorted sleep index and daily rollups against a full scan"""
+    print("Testing sleep record index and daily rollups...")
+    import random
+
+    data_file = "/tmp/test_sleep_index.json"
+    journal_file = "/tmp/test_sleep_index.journal.jsonl"
+    for path in (data_file, journal_file):
+        if os.path.exists(path):
+            os.remove(path)
+
+    sensor = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    rng = random.Random(42)
+    base = datetime(2024, 5, 1)
+    for _ in range(200):
+        start = base + timedelta(minutes=rng.randrange(0, 60 * 24 * 60, 15))
+        end = start + timedelta(minutes=rng.randrange(20, 600, 5))
+        sensor.add_sleep_record(rng.choice(["night", "nap"]), start.isoformat(), end.isoformat(),
+                                quality=rng.choice(["poor", "normal", "good"]))
+
+    # Latest records match a full sort of the stored list
+    records = sensor.data["sleep_records"]
+    expected = sorted(records, key=lambda x: x["start_time"], reverse=True)
+    assert sensor.get_sleep_records(50) == expected[:50], "Latest records differ from full sort"
+    assert sensor.get_sleep_records(1000) == expected, "Full record list differs"
+
+    # Range queries match a linear scan
+    for target, days_back in [("2024-05-20", 7), ("2024-06-29", 30), ("2024-04-01", 3)]:
+        target_date = datetime.fromisoformat(target).date()
+        start_date = target_date - timedelta(days=days_back)
+        scanned = [r for r in records if start_date <= datetime.fromisoformat(r["date"]).date() <= target_date]
+        indexed = sensor._snapshot.sleep_index.between(start_date, target_date)
+        assert sorted(map(id, indexed)) == sorted(map(id, scanned)), f"Range query differs for {target}"
+
+    print(f"  Indexed {len(sensor._snapshot.sleep_index)} sleep records")
+
+    # Daily rollups give the same summary as aggregating the raw sessions
+    for target, days_back in [("2024-05-20", 7), ("2024-06-29", 90)]:
+        target_date = datetime.fromisoformat(target).date()
+        start_date = target_date - timedelta(days=days_back)
+        scanned = [r for r in records if start_date <= datetime.fromisoformat(r["date"]).date() <= target_date]
+        summary = sensor.get_sleep_summary(target, days_back)
+        assert summary["total_sleep_hours"] == round(sum(r["duration_hours"] for r in scanned), 1), \
+            f"Rollup total differs for {target}"
+        assert summary["total_naps"] == len([r for r in scanned if r["sleep_type"] == "nap"]), "Nap count differs"
+        assert summary["quality_distribution"] == sensor._calculate_quality_distribution(scanned), \
+            "Quality distribution differs"
+
+    # A batched series matches the single-window summary over the same range
+    series = sensor.get_sleep_series("2024-05-01", "2024-06-29", bucket="week")
+    summary = sensor.get_sleep_summary("2024-06-29", 59)
+    assert series["series"][0]["start"] == "2024-05-01", "Series does not start at range start"
+    assert sum(b["total_naps"] for b in series["series"]) == summary["total_naps"], "Series nap count differs"
+    assert sum(b["total_nights"] for b in series["series"]) == summary["total_nights"], "Series night count differs"
+    for quality, count in summary["quality_distribution"].items():
+        assert sum(b["quality_distribution"][quality] for b in series["series"]) == count, \
+            "Series quality distribution differs"
+    monthly = sensor.get_sleep_series("2024-05-01", "2024-06-29", bucket="month")
+    print(f"  Series buckets: {len(series['series'])} weeks, {len(monthly['series'])} months")
+
+    # Rollups are persisted with the snapshot and reloaded
+    sensor._save_data()
+    reloaded = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    assert reloaded.data["sleep_daily_rollups"] == sensor.data["sleep_daily_rollups"], "Rollups not persisted"
+    assert reloaded.data["sleep_daily_rollups"]["records"] == 200, "Rollup record count wrong"
+
+    # Long windows give the exact session total, however records fall into days
+    lines = []
+    for _ in range(750):
+        start = base + timedelta(minutes=rng.randrange(0, 60 * 24 * 365, 15))
+        end = start + timedelta(minutes=rng.randrange(20, 600, 5))
+        lines.append(json.dumps({
+            "section": "sleep_records", "sleep_type": rng.choice(["night", "nap"]),
+            "start_time": start.isoformat(), "end_time": end.isoformat(),
+            "quality": rng.choice(["poor", "normal", "good"])
+        }))
+    sensor.import_records(lines)
+    for target, days_back in [("2025-04-30", 365), ("2025-03-31", 300)]:
+        target_date = datetime.fromisoformat(target).date()
+        start_date = target_date - timedelta(days=days_back)
+        scanned = [r for r in sensor.data["sleep_records"]
+                   if start_date <= datetime.fromisoformat(r["date"]).date() <= target_date]
+        exact = sum(Decimal(str(r["duration_hours"])) for r in scanned)
+        expected = float(exact.quantize(Decimal("0.1"), rounding=ROUND_HALF_UP))
+        summary = sensor.get_sleep_summary(target, days_back)
+        print(f"  {days_back}-day total: {summary['total_sleep_hours']} h (sessions: {expected} h)")
+        assert summary["total_sleep_hours"] == expected, f"Long window total differs for {target}"
+
+    # Each series bucket has the summary's exact total for the same days
+    monthly = sensor.get_sleep_series("2024-05-01", "2025-04-30", bucket="month")
+    for entry in monthly["series"]:
+        summary = sensor.get_sleep_summary(entry["end"], entry["days"] - 1)
+        assert entry["total_sleep_hours"] == summary["total_sleep_hours"], \
+            f"Series total differs from summary for {entry['start']}"
+        assert entry["average_night_sleep"] == summary["average_night_sleep"], \
+            f"Series night average differs from summary for {entry['start']}"
+    try:
+        sensor.get_sleep_series("2023-01-01", "2025-04-30", bucket="day")
+        assert False, "Oversized series accepted"
+    except ValueError:
+        pass
+    # The import can start a background compaction that would recreate the files
+    if sensor.storage._compactor:
+        sensor.storage._compactor.join()
+
+    for path in (data_file, journal_file):
+        if os.path.exists(path):
+            os.remove(path)
+
+    print("  ✓ Sleep record index and rollups work!\n")
+
+def test_pride_archive_timeline():
+    """Test materialized pride archive timeline against a full rebuild"""
+    print("Testing materialized pride archive timeline...")
+
+    data_file = "/tmp/test_timeline.json"
+    journal_file = "/tmp/test_timeline.journal.jsonl"
+    for path in (data_file, journal_file):
+        if os.path.exists(path):
+            os.remove(path)
+
+    sensor = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    sensor.add_milestone_achievement("motor", "Rolls over")
+    sensor.add_growth_record(weight_kg=5.1, height_cm=58.0)
+    for exam_name, date in [("U4", "2024-05-02"), ("U5", "2024-08-20"), ("U3", "2024-05-02"), ("U6", "2024-12-01")]:
+        sensor.mark_u_examination_completed(exam_name, date=date)
+    sensor.add_milestone_achievement("language", "Babbles")
+
+    def rebuild(filter_category=None, sort_order="desc"):
+        events = (
+            [sensor._format_event("milestone", a) for a in sensor.data["milestone_achievements"]]
+            + [sensor._format_event("growth", r) for r in sensor.data["growth_records"]]
+            + [sensor._format_event("u_examination", e) for e in sensor.data["u_examinations_records"]]
+        )
+        if filter_category:
+            events = [e for e in events if e["category"] == filter_category]
+        events.sort(key=lambda x: x["date"], reverse=(sort_order == "desc"))
+        return events
+
+    for filter_category in (None, "health", "motor", "unknown"):
+        for sort_order in ("asc", "desc"):
+            archive = sensor.get_pride_archive(filter_category, sort_order)
+            expected = rebuild(filter_category, sort_order)
+            assert archive["events"] == expected, f"Timeline differs for {filter_category}/{sort_order}"
+            assert archive["total_count"] == len(expected), "Total count differs"
+            assert sum(archive["categories"].values()) == len(expected), "Category counts differ"
+
+    archive = sensor.get_pride_archive()
+    assert archive["date_range"]["start"] == "2024-05-02T00:00:00", "Date range start wrong"
+    print(f"  Timeline events: {archive['total_count']}, categories: {archive['categories']}")
+
+    monthly = sensor.get_monthly_summary("2024-05")
+    expected = [e for e in rebuild() if e["date"].startswith("2024-05")]
+    assert monthly["events"] == expected, "Monthly events differ"
+    assert monthly["categories"] == {"health": 2}, "Monthly categories differ"
+
+    # Paging through the timeline yields the same events as one full request
+    for filter_category in (None, "health"):
+        for sort_order in ("asc", "desc"):
+            expected = rebuild(filter_category, sort_order)
+            for limit in (1, 2, 3, 10):
+                paged = []
+                cursor = None
+                while True:
+                    page = sensor.get_pride_archive(filter_category, sort_order, limit=limit, cursor=cursor)
+                    paged.extend(page["events"])
+                    cursor = page["next_cursor"]
+                    if not cursor:
+                        break
+                assert paged == expected, f"Paged timeline differs ({filter_category}/{sort_order}/{limit})"
+
+    # Growth and milestone history pages follow the stored order
+    history = sensor.get_milestone_history()
+    first = sensor.get_milestone_history_page(limit=1)
+    second = sensor.get_milestone_history_page(limit=1, cursor=first["next_cursor"])
+    assert first["records"] + second["records"] == history, "Milestone pages differ"
+    assert second["next_cursor"] is None, "Unexpected cursor on last page"
+    try:
+        sensor.get_growth_history_page(cursor="not-a-cursor")
+        assert False, "Invalid cursor accepted"
+    except ValueError:
+        pass
+
+    # Cursors stay valid after a restart, also for records added after the timeline was built
+    sensor.add_milestone_achievement("motor", "Sits without support")
+
+    def cursors(archive_sensor):
+        found, cursor = [], None
+        while True:
+            cursor = archive_sensor.get_pride_archive(sort_order="asc", limit=1, cursor=cursor)["next_cursor"]
+            if not cursor:
+                return found
+            found.append(cursor)
+
+    restarted = EarlyBirdSensor("Test Baby", "2024-01-01", "2024-02-26", data_file=data_file)
+    assert cursors(restarted) == cursors(sensor), "Cursors changed by a restart"
+
+    # Page sizes must be positive and are capped
+    for page in (sensor.get_growth_history_page, sensor.get_milestone_history_page,
+                 lambda limit: sensor.get_pride_archive(limit=limit)):
+        for limit in (0, -1):
+            try:
+                page(limit=limit)
+                assert False, f"limit={limit} accepted"
+            except ValueError:
+                pass
+    sensor.MAX_PAGE_SIZE = 2
+    assert len(sensor.get_pride_archive(limit=100)["events"]) == 2, "Page size not capped"
+    del sensor.MAX_PAGE_SIZE
+
+    for path in (data_file, journal_file):
+        if os.path.exists(path):
+            os.remove(path)
+
+    print("  ✓ Materialized timeline and pagination work!\n")
+
 def main():
     print("=" * 60)
     print("Early Bird Sensor Test Suite")
@@ -410,6 +1433,10 @@ def main():
         test_encouragement(sensor)
         test_u_examinations(sensor)
         test_summary(sensor)
+        test_evaluation_context(sensor)
+        test_summary_cache(sensor)
+        test_dashboard(sensor)
+        test_change_stream(sensor)
 
         # Phase 2 Tests
         print("=" * 60)
@@ -420,14 +1447,39 @@ def main():
         test_progress_reminders(sensor)
         test_growth_statistics(sensor)
         test_pride_archive(sensor)
+        test_export(sensor)
+        test_snapshots(sensor)
+        test_metrics(sensor)
+        test_profiling(sensor)
+        test_benchmark_history()
+        test_load_test_integrity()
+        test_startup_readiness()
+        test_conditional_requests()
+        test_lazy_sections()
+        test_sleep_index()
+        test_pride_archive_timeline()
+
+        # Storage Tests
+        print("=" * 60)
+        print("Storage Tests")
+        print("=" * 60 + "\n")
+
+        test_journal_storage()
+        test_sqlite_storage()
+        test_write_behind()
+        test_change_feed()
+        test_import()
+        test_concurrent_access()
+        test_multi_worker()
 
         print("=" * 60)
         print("✓ All tests passed successfully!")
         print("=" * 60)
 
-        # Clean up test file
-        if os.path.exists("/tmp/test_data.json"):
-            os.remove("/tmp/test_data.json")
+        # Clean up test files
+        for path in ("/tmp/test_data.json", "/tmp/test_data.journal.jsonl") + tuple(glob.glob("/tmp/test_*.lock")):
+            if os.path.exists(path):
+                os.remove(path)
 
         return 0
     except Exception as e:
@@ -35,6 +35,12 @@ check_file "early_bird/build.json"
 check_file "early_bird/requirements.txt"
 check_file "early_bird/run.py"
 check_file "early_bird/sensor.py"
+check_file "early_bird/storage.py"
+check_file "early_bird/indexes.py"
+check_file "early_bird/events.py"
+check_file "early_bird/exchange.py"
+check_file "early_bird/metrics.py"
+check_file "early_bird/profiling.py"
 check_file "early_bird/apparmor.txt"
 
 echo ""
@@ -71,6 +77,54 @@ else
     ((ERRORS++))
 fi
 
+python3 -m py_compile early_bird/storage.py 2>/dev/null
+if [ $? -eq 0 ]; then
+    echo "✓ storage.py syntax OK"
+else
+    echo "✗ storage.py has syntax errors"
+    ((ERRORS++))
+fi
+
+python3 -m py_compile early_bird/indexes.py 2>/dev/null
+if [ $? -eq 0 ]; then
+    echo "✓ indexes.py syntax OK"
+else
+    echo "✗ indexes.py has syntax errors"
+    ((ERRORS++))
+fi
+
+python3 -m py_compile early_bird/events.py 2>/dev/null
+if [ $? -eq 0 ]; then
+    echo "✓ events.py syntax OK"
+else
+    echo "✗ events.py has syntax errors"
+    ((ERRORS++))
+fi
+
+python3 -m py_compile early_bird/exchange.py 2>/dev/null
+if [ $? -eq 0 ]; then
+    echo "✓ exchange.py syntax OK"
+else
+    echo "✗ exchange.py has syntax errors"
+    ((ERRORS++))
+fi
+
+python3 -m py_compile early_bird/metrics.py 2>/dev/null
+if [ $? -eq 0 ]; then
+    echo "✓ metrics.py syntax OK"
+else
+    echo "✗ metrics.py has syntax errors"
+    ((ERRORS++))
+fi
+
+python3 -m py_compile early_bird/profiling.py 2>/dev/null
+if [ $? -eq 0 ]; then
+    echo "✓ profiling.py syntax OK"
+else
+    echo "✗ profiling.py has syntax errors"
+    ((ERRORS++))
+fi
+
 python3 -m py_compile early_bird/run.py 2>/dev/null
 if [ $? -eq 0 ]; then
     echo "✓ run.py syntax OK"